@@ -0,0 +1,317 @@
+# benchmarks/run_benchmarks.py
+"""
+模块功能：
+    可复现的基准测试。用 benchmarks.synthetic 离线生成作业压缩包，逐阶段运行处理流水线并输出 JSON 报告，
+    升级或修改 parse_pdf_report / ocr_process_pdf / classify / 进程池配置前后各跑一次，即可对比快慢。
+
+说明：
+    阶段划分与 main.py 的流程一致：
+        unzip       流式解压 (iter_unzip)，样本为相邻两个文件就绪的间隔
+        scan        扫描解压目录构建任务清单 (scan_assignment_files)，样本为每轮耗时
+        text_parse  单进程逐个文本解析 (parse_pdf_report, allow_ocr=False)，样本为每个文件耗时
+        ocr         单进程逐个 OCR (ocr_process_pdf)，只处理分诊出的扫描件，最多 --ocr-limit 份
+        pipeline    按 main.py 的配置创建两级调度器，端到端处理整个任务清单，样本为每轮耗时
+        classify    分层预警 (classify)，样本为每轮耗时
+        export      输出 Excel 报表与列式结果，样本为每轮耗时
+    每个阶段报告：处理文件数、总耗时、files/sec、p50/p95 延迟 (毫秒)、阶段内的峰值常驻内存 (含子进程)
+
+    命令行用法 (在仓库根目录执行)：
+        python -m benchmarks.run_benchmarks --files 500 --image-ratio 0.2 --encoding mixed --output result.json
+        python -m benchmarks.run_benchmarks --zip data/raw/xxx.zip --stages unzip,scan,text_parse
+
+依赖关系：
+    psutil: 采样常驻内存
+    benchmarks.synthetic: 生成合成压缩包
+    src.*: 被测的各个阶段
+    main: 复用主程序的调度计划与调度器配置
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+import contextlib
+
+import numpy as np
+import psutil
+
+from benchmarks.synthetic import build_archive
+from src.raw_file_processor import iter_unzip, scan_assignment_files
+from src.pdf_handler import parse_pdf_report, NEEDS_OCR
+from src.ocr_engine import ocr_process_pdf
+from src.layer import classify
+from src.exporter import save_assignment_reports, save_columnar
+
+ALL_STAGES = ["unzip", "scan", "text_parse", "ocr", "pipeline", "classify", "export"]
+
+
+class RssSampler:
+    """
+    在后台线程中定期采样本进程及其全部子进程的常驻内存之和，记录峰值 (MB)
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def _sample(self) -> float:
+        proc = psutil.Process()
+        total = proc.memory_info().rss
+        for child in proc.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                pass # 子进程可能在采样时刚好退出
+        return total / (1024 * 1024)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.peak_mb = max(self.peak_mb, self._sample())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, self._sample())
+        return False
+
+
+def summarize(samples: list, files: int, seconds: float, peak_mb: float, **extra) -> dict:
+    """
+    函数功能：
+        把一个阶段的耗时样本汇总为报告条目
+
+    Args:
+        samples (list[float]): 延迟样本 (秒)
+        files (int): 该阶段处理的文件数
+        seconds (float): 该阶段的总耗时 (秒)
+        peak_mb (float): 阶段内的峰值常驻内存
+        **extra: 附加字段 (例如失败数)
+
+    Returns:
+        dict: files / seconds / files_per_sec / p50_ms / p95_ms / peak_rss_mb 及附加字段
+    """
+    ms = np.array(samples, dtype=float) * 1000 if samples else np.array([0.0])
+    return {
+        "files": files,
+        "seconds": round(seconds, 4),
+        "files_per_sec": round(files / seconds, 2) if seconds > 0 else None,
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "peak_rss_mb": round(peak_mb, 1),
+        **extra,
+    }
+
+
+def run_stage(name: str, func):
+    """
+    函数功能：
+        运行一个阶段：屏蔽被测代码的控制台输出，计时并采样内存
+
+    Args:
+        name (str): 阶段名 (用于进度提示)
+        func (callable): 无参函数，返回 (延迟样本, 文件数, 附加字段 dict)
+
+    Returns:
+        dict: summarize 的输出
+    """
+    print(f"[基准测试] 正在运行阶段: {name} ...", file=sys.stderr)
+    with RssSampler() as sampler, open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        samples, files, extra = func()
+        seconds = time.perf_counter() - start
+    return summarize(samples, files, seconds, sampler.peak_mb, **extra)
+
+
+def environment() -> dict:
+    """
+    函数功能：
+        记录运行环境，便于比较不同机器、不同版本之间的结果
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "memory_mb": round(psutil.virtual_memory().total / (1024 * 1024)),
+        "git_commit": commit or None,
+    }
+
+
+def run_benchmarks(zip_path: str, workdir: str, stages: list, repeat: int = 3, ocr_limit: int = 20,
+                   unzip_threads: int = 4) -> dict:
+    """
+    函数功能：
+        对一个压缩包逐阶段运行基准测试
+
+    Args:
+        zip_path (str): 作业压缩包
+        workdir (str): 临时工作目录 (解压目录与导出文件都放在这里)
+        stages (list[str]): 需要运行的阶段，解压与扫描总会执行 (后续阶段依赖它们的产出)
+        repeat (int): 整批类阶段 (scan / pipeline / classify / export) 的重复轮数
+        ocr_limit (int): ocr 阶段最多处理的扫描件数量
+        unzip_threads (int): 解压线程数
+
+    Returns:
+        dict: {阶段名: 报告条目}
+    """
+    extract_dir = os.path.join(workdir, "processed")
+    export_dir = os.path.join(workdir, "export")
+    report = {}
+    state = {}
+
+    def unzip_stage():
+        samples, last = [], time.perf_counter()
+        count = 0
+        for _ in iter_unzip(zip_path, extract_dir, incremental=False, threads=unzip_threads):
+            now = time.perf_counter()
+            samples.append(now - last)
+            last = now
+            count += 1
+        return samples, count, {}
+
+    def scan_stage():
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            state["files"] = scan_assignment_files(extract_dir)
+            samples.append(time.perf_counter() - start)
+        return samples, len(state["files"]) * repeat, {}
+
+    def text_stage():
+        samples, results = [], []
+        for info in state["files"]:
+            start = time.perf_counter()
+            res = dict(info, **parse_pdf_report(info["文件路径"], allow_ocr=False))
+            samples.append(time.perf_counter() - start)
+            results.append(res)
+        state["results"] = results
+        needs_ocr = sum(1 for r in results if r["状态"] == NEEDS_OCR)
+        return samples, len(results), {"needs_ocr": needs_ocr}
+
+    def ocr_stage():
+        targets = [r for r in state["results"] if r["状态"] == NEEDS_OCR][:ocr_limit]
+        samples, failed = [], 0
+        for res in targets:
+            start = time.perf_counter()
+            res.update(ocr_process_pdf(res["文件路径"]))
+            samples.append(time.perf_counter() - start)
+            failed += res["状态"] in ("OCR失败", "无法判定")
+        return samples, len(targets), {"failed": failed}
+
+    def pipeline_stage():
+        import main as app # 复用主程序的调度配置 (进程数、分块、OCR 组批、超时等)
+        samples = []
+        plan = app.plan_workers(len(state["files"]))
+        for _ in range(repeat):
+            files = [dict(info) for info in state["files"]]
+            start = time.perf_counter()
+            with app.create_scheduler(plan) as scheduler:
+                state["pipeline_results"] = scheduler.run(files)
+            samples.append(time.perf_counter() - start)
+        return samples, len(state["files"]) * repeat, {"plan": plan}
+
+    def classify_stage():
+        rows = state.get("pipeline_results") or state.get("results") or []
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            state["classified"] = classify([dict(r) for r in rows])
+            samples.append(time.perf_counter() - start)
+        return samples, len(rows) * repeat, {}
+
+    def export_stage():
+        df = state["classified"]
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            save_assignment_reports({"benchmark": df}, export_dir, combined_path=os.path.join(export_dir, "汇总.xlsx"))
+            save_columnar({"benchmark": df}, os.path.join(export_dir, "benchmark.parquet"))
+            samples.append(time.perf_counter() - start)
+        return samples, len(df) * repeat, {}
+
+    funcs = {"unzip": unzip_stage, "scan": scan_stage, "text_parse": text_stage, "ocr": ocr_stage,
+             "pipeline": pipeline_stage, "classify": classify_stage, "export": export_stage}
+    # 后续阶段依赖的产出：text_parse 为 ocr / classify 提供结果，classify 为 export 提供分类表
+    required = {"unzip", "scan"}
+    if "ocr" in stages or ("classify" in stages and "pipeline" not in stages):
+        required.add("text_parse")
+    if "export" in stages:
+        required.add("classify")
+
+    for name in ALL_STAGES:
+        if name in stages or name in required:
+            report[name] = run_stage(name, funcs[name])
+    return report
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="EduCoder 预警系统基准测试")
+    parser.add_argument("--zip", help="使用已有的压缩包，不生成合成数据")
+    parser.add_argument("--files", type=int, default=200, help="合成压缩包的 pdf 数量")
+    parser.add_argument("--classes", type=int, default=4)
+    parser.add_argument("--image-ratio", type=float, default=0.2, help="图片型 pdf 的比例")
+    parser.add_argument("--encoding", choices=["utf-8", "gbk", "mixed"], default="mixed", help="压缩包内文件名编码")
+    parser.add_argument("--pad-kb", type=int, default=0, help="每份 pdf 额外填充的大小 (KB)")
+    parser.add_argument("--seed", type=int, default=2024)
+    parser.add_argument("--stages", default=",".join(ALL_STAGES), help="逗号分隔的阶段列表")
+    parser.add_argument("--repeat", type=int, default=3, help="整批类阶段的重复轮数")
+    parser.add_argument("--ocr-limit", type=int, default=20, help="ocr 阶段最多处理的扫描件数量")
+    parser.add_argument("--unzip-threads", type=int, default=4)
+    parser.add_argument("--workdir", help="工作目录 (默认使用临时目录，运行结束后删除)")
+    parser.add_argument("--output", help="JSON 报告的输出路径 (默认只打印)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = set(stages) - set(ALL_STAGES)
+    if unknown:
+        raise SystemExit(f"[Error] 未知的阶段: {', '.join(sorted(unknown))} (可选 {', '.join(ALL_STAGES)})")
+
+    with contextlib.ExitStack() as stack:
+        workdir = args.workdir or stack.enter_context(tempfile.TemporaryDirectory(prefix="educoder_bench_"))
+        os.makedirs(workdir, exist_ok=True)
+
+        if args.zip:
+            zip_path, dataset = args.zip, {"zip": os.path.abspath(args.zip)}
+        else:
+            zip_path = os.path.join(workdir, "synthetic.zip")
+            print("[基准测试] 正在生成合成压缩包 ...", file=sys.stderr)
+            dataset = build_archive(zip_path, args.files, args.classes, args.image_ratio,
+                                    args.encoding, args.pad_kb, args.seed)
+        dataset["zip_bytes"] = os.path.getsize(zip_path)
+
+        result = {
+            "environment": environment(),
+            "dataset": dataset,
+            "config": {"stages": stages, "repeat": args.repeat, "ocr_limit": args.ocr_limit,
+                       "unzip_threads": args.unzip_threads},
+            "stages": run_benchmarks(zip_path, workdir, stages, args.repeat, args.ocr_limit, args.unzip_threads),
+        }
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+# benchmarks/synthetic.py
+"""
+模块功能：
+    离线生成 EduCoder 风格的合成作业压缩包，供基准测试使用，不依赖任何真实学生数据。
+
+说明：
+    压缩包结构与 EduCoder 导出的一致：班级/学号+姓名/学号+姓名.pdf
+    - 文本型 pdf：报告页中写入状态与 "实训总耗时"，走 pdfplumber 快速路径
+    - 图片型 pdf：先生成同样内容的文本页，再渲染成图片嵌入新页面，只能通过 OCR 识别
+    - 班级规模不均匀 (按权重随机分班)，另含少量 "未分班" 的作业
+    - 文件名编码可选 UTF-8 (带 UTF-8 标志位) 或 GBK (Windows 压缩软件的默认行为，不带标志位)
+    - 可通过 pad_kb 在 pdf 中嵌入噪声图片，模拟体积较大的报告
+    同一组参数与随机种子总是生成完全相同的压缩包
+
+    命令行用法：
+        python -m benchmarks.synthetic out.zip --files 500 --image-ratio 0.2 --encoding gbk
+
+依赖关系：
+    fitz (PyMuPDF): 生成 pdf 与渲染图片页
+    zipfile: 写入压缩包
+"""
+import argparse
+import random
+import zipfile
+
+import fitz
+
+STATUSES = ["按时通关", "按时通关", "按时通关", "截止后通关", "未通关"]
+
+
+class _GbkZipInfo(zipfile.ZipInfo):
+    # zipfile 默认把非 ASCII 文件名编码为 UTF-8 并打上标志位，这里模拟 Windows 压缩软件写入 GBK 原始字节
+    def _encodeFilenameFlags(self):
+        return self.filename.encode('gbk'), self.flag_bits
+
+
+def random_duration(rng: random.Random) -> str:
+    """
+    函数功能：
+        随机生成一个耗时文本：大多数在几十分钟到数小时，少量为秒刷、跨天或 "--"
+    """
+    roll = rng.random()
+    if roll < 0.05:
+        return "--"
+    if roll < 0.15:
+        return f"{rng.randint(1, 9)}分{rng.randint(0, 59)}秒"
+    if roll < 0.20:
+        return f"{rng.randint(1, 3)}天{rng.randint(0, 23)}时{rng.randint(0, 59)}分"
+    return f"{rng.randint(0, 4)}时{rng.randint(0, 59)}分{rng.randint(0, 59)}秒"
+
+
+def text_pdf(status: str, duration: str, pad_kb: int = 0, seed: int = 0) -> bytes:
+    """
+    函数功能：
+        生成一份文本型报告 pdf
+
+    Args:
+        status (str): 通关状态
+        duration (str): 实训总耗时
+        pad_kb (int): 额外嵌入的噪声图片大小 (KB)，0 表示不填充
+        seed (int): 噪声图片的随机种子
+
+    Returns:
+        bytes: pdf 字节
+    """
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((50, 60), "EduCoder 实训报告", fontname="china-s", fontsize=18)
+    page.insert_text((50, 100), f"状态 {status}", fontname="china-s", fontsize=12)
+    page.insert_text((50, 130), f"实训总耗时 {duration}", fontname="china-s", fontsize=12)
+    page.insert_text((50, 160), "页面停留时长 --", fontname="china-s", fontsize=12)
+    if pad_kb > 0:
+        _insert_noise(page, pad_kb, seed)
+    data = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    return data
+
+
+def image_pdf(status: str, duration: str, dpi: int = 150, pad_kb: int = 0, seed: int = 0) -> bytes:
+    """
+    函数功能：
+        生成一份图片型 (扫描件) 报告 pdf：页面上只有一张图片，没有文本层
+
+    Args:
+        status (str): 通关状态
+        duration (str): 实训总耗时
+        dpi (int): 渲染报告页所用的分辨率
+        pad_kb (int): 额外嵌入的噪声图片大小 (KB)
+        seed (int): 噪声图片的随机种子
+
+    Returns:
+        bytes: pdf 字节
+    """
+    src = fitz.open(stream=text_pdf(status, duration), filetype="pdf")
+    pix = src[0].get_pixmap(dpi=dpi, colorspace=fitz.csRGB, alpha=False)
+    doc = fitz.open()
+    page = doc.new_page(width=src[0].rect.width, height=src[0].rect.height)
+    page.insert_image(page.rect, pixmap=pix)
+    src.close()
+    if pad_kb > 0:
+        _insert_noise(page, pad_kb, seed)
+    data = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    return data
+
+
+def _insert_noise(page, pad_kb: int, seed: int):
+    # 随机像素几乎无法压缩，图片字节数约等于 pad_kb
+    side = max(1, int((pad_kb * 1024 / 3) ** 0.5))
+    samples = random.Random(seed).randbytes(side * side * 3)
+    pix = fitz.Pixmap(fitz.csRGB, side, side, samples, False)
+    page.insert_image(fitz.Rect(0, page.rect.height - 20, 20, page.rect.height), pixmap=pix)
+
+
+def build_archive(zip_path: str, files: int = 200, classes: int = 4, image_ratio: float = 0.2,
+                  encoding: str = "utf-8", pad_kb: int = 0, seed: int = 2024) -> dict:
+    """
+    函数功能：
+        生成一个合成作业压缩包
+
+    Args:
+        zip_path (str): 输出路径
+        files (int): pdf 数量
+        classes (int): 班级数 (班级规模按随机权重分配，不均匀)
+        image_ratio (float): 图片型 pdf 的比例
+        encoding (str): 文件名编码，"utf-8" 或 "gbk"；"mixed" 表示两种交替出现
+        pad_kb (int): 每份 pdf 额外填充的大小 (KB)
+        seed (int): 随机种子
+
+    Returns:
+        dict: 生成结果的统计 (文件数、图片型数量、压缩包字节数等)
+    """
+    rng = random.Random(seed)
+    class_names = [f"计科{i + 1}班" for i in range(classes)] + ["未分班"]
+    weights = [rng.uniform(0.5, 2.0) for _ in range(classes)] + [0.1]
+    image_count = 0
+
+    with zipfile.ZipFile(zip_path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for i in range(files):
+            class_name = rng.choices(class_names, weights)[0]
+            sid, name = f"2024{i:05d}", f"学生{i}"
+            status, duration = rng.choice(STATUSES), random_duration(rng)
+            if rng.random() < image_ratio:
+                data = image_pdf(status, duration, pad_kb=pad_kb, seed=seed + i)
+                image_count += 1
+            else:
+                data = text_pdf(status, duration, pad_kb=pad_kb, seed=seed + i)
+
+            member = f"{class_name}/{sid}+{name}/{sid}+{name}.pdf"
+            use_gbk = encoding == "gbk" or (encoding == "mixed" and i % 2)
+            info = (_GbkZipInfo if use_gbk else zipfile.ZipInfo)(member, date_time=(2024, 9, 1, 8, 0, 0))
+            info.compress_type = zipfile.ZIP_DEFLATED
+            zf.writestr(info, data)
+
+        # macOS 压缩时附带的垃圾文件，解压与扫描时应被过滤
+        zf.writestr("__MACOSX/._junk", b"x")
+
+    return {"files": files, "image_files": image_count, "classes": classes,
+            "encoding": encoding, "pad_kb": pad_kb, "seed": seed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成合成的 EduCoder 作业压缩包")
+    parser.add_argument("output", help="输出的 zip 路径")
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--classes", type=int, default=4)
+    parser.add_argument("--image-ratio", type=float, default=0.2)
+    parser.add_argument("--encoding", choices=["utf-8", "gbk", "mixed"], default="utf-8")
+    parser.add_argument("--pad-kb", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=2024)
+    args = parser.parse_args()
+    print(build_archive(args.output, args.files, args.classes, args.image_ratio, args.encoding, args.pad_kb, args.seed))
+
+
+if __name__ == '__main__':
+    main()
@@ -9,87 +9,434 @@
     2. 数据摄入 (Ingest)
     3. 并行计算调度 (Map-Reduce)
     4. 数据交付 (Export)
+    除单次运行外，还可以 --serve 启动常驻服务 (见 src.server)，进程池与模型只加载一次
 """
 import os
 import time
+import json
+import argparse
+import zipfile
+import itertools
 import multiprocessing
-from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 import pandas as pd
 
 # --- 模块导入 ---
-from src.raw_file_processor import unzip_file, scan_assignment_files, get_raw_zip_file
-from src.pdf_handler import enrich_data
-from src.utils import print_progress
-from src.layer import classify
+from src.raw_file_processor import (unzip_file, scan_assignment_files, scan_zip_members, get_raw_zip_file,
+                                    get_raw_zip_files, stream_assignment_files, count_zip_pdfs)
+from src.scheduler import TwoStageScheduler, plan_resources
+from src.pdf_handler import PARSER_VERSION
+from src.cache import ResultCache
+from src.checkpoint import RunJournal
+from src.progress import ProgressReporter
+from src.layer import classify_by_assignment, slim_row
+from src.longitudinal import LongitudinalModel
+from src.exporter import save_report, save_assignment_reports, save_columnar, ResultSink
+from src.profiler import HotPathReport
 
 # --- 1.全局路径配置 ---
 # 使用相对路径确保跨平台兼容性
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 RAW_DIR = os.path.join(BASE_DIR, "data", "raw")
 PROCESSED_DIR = os.path.join(BASE_DIR, "data", "processed")
-OUTPUT_FILE = os.path.join(BASE_DIR, "data", "2_final_report.xlsx")
+OUTPUT_FILE = os.path.join(BASE_DIR, "data", "2_final_report.xlsx") # 分类报表 (.xlsx / .csv / .jsonl)，None 表示不写出
+COLUMNAR_FILE = os.path.join(BASE_DIR, "data", "2_final_report.parquet") # 列式结果 (.parquet / .feather)，None 表示不写出
+REPORT_DIR = os.path.join(BASE_DIR, "data", "reports") # 批量模式下每份作业一个报表
+CACHE_FILE = os.path.join(BASE_DIR, "data", "cache", "results.sqlite")
+JOURNAL_FILE = os.path.join(BASE_DIR, "data", "cache", "run_journal.jsonl") # 断点续跑日志
+LONGITUDINAL_FILE = os.path.join(BASE_DIR, "data", "cache", "longitudinal.json") # 纵向预警模型的累计状态
+# 解析明细边完成边写出 (.csv / .jsonl / .parquet)，None 表示不写出
+RECORD_FILE = os.path.join(BASE_DIR, "data", "1_parse_records.jsonl")
+PROFILE_FILE = os.path.join(BASE_DIR, "data", "3_hot_path_report.json") # 性能剖析报告 (开启剖析时写出)
+METRICS_FILE = os.path.join(BASE_DIR, "data", "metrics", "educoder.prom") # Prometheus 文本格式的实时指标，None 表示不写出
+PROGRESS_LOG_FILE = os.path.join(BASE_DIR, "data", "logs", "progress.jsonl") # stdout 不是终端时的 JSON 进度日志
+
+# --- 2.运行参数配置 ---
+# 数据摄入模式："extract" 先解压到 data/processed 再扫描；"zip" 免解压，直接从压缩包内读取 pdf
+INGEST_MODE = "extract"
+# 增量解压：只解压新增或变化的作业，删除已撤回的作业；False 则每次清空后全量解压
+INCREMENTAL_UNZIP = True
+# 流式摄入：边解压边解析 (解压与并行解析重叠)，UNZIP_THREADS 为解压线程数
+STREAM_INGEST = True
+UNZIP_THREADS = 4
+# OCR 模型只存在于 OCR 进程池中，分诊进程永远不会加载模型
+# OCR 进程在启动时预加载模型 (进程池按需启动，没有扫描件就不会加载)
+PRELOAD_OCR_MODEL = True
+# 进程数由 CPU 核心数与可用内存共同决定：OCR 进程池大小 = min(内存预算, 剩余可用内存) / 单个模型进程的常驻内存
+OCR_MEMORY_BUDGET_MB = 4096
+OCR_MODEL_RSS_MB = 1024
+TEXT_WORKER_RSS_MB = 150
+MEMORY_RESERVE_MB = 1024
+# 小于该大小的 pdf 会被打包成块派发 (块大小由调度计划决定)，大文件优先派发
+SMALL_FILE_BYTES = 512 * 1024
+# 流式摄入时无法对整个清单排序，改为预读 STREAM_LOOKAHEAD 份、每次派发其中最大的一份：
+# 窗口越大越接近整体排序，但要先等这么多份解压出来才开始派发；0 表示按到达顺序派发
+STREAM_LOOKAHEAD = 64
+# 扫描件组批推理：每批最多多少份，批次最多等待多少秒
+OCR_BATCH_SIZE = 8
+OCR_FLUSH_TIMEOUT = 2.0
+# 区域识别 (ROI)：只识别报告中状态与耗时所在的区域，识别不全时自动退回整页
+# 区域坐标见 src.ocr_engine.ROI_TEMPLATE，可通过 OCR_ROI_TEMPLATE 覆盖 (None 表示使用默认模板)
+OCR_USE_ROI = True
+OCR_ROI_TEMPLATE = None
+# 多分辨率识别：先以 OCR_LOW_DPI 渲染识别，状态或耗时缺失、或置信度低于 OCR_MIN_CONFIDENCE 的文件
+# 再以 OCR_ESCALATE_DPI 重新渲染识别 (OCR_ESCALATE_DPI 为 None 表示只用 OCR_LOW_DPI 识别一次)
+OCR_LOW_DPI = 100
+OCR_ESCALATE_DPI = 200
+OCR_MIN_CONFIDENCE = 0.85
+# 结果缓存：按 pdf 内容哈希复用上次的解析结果，超过保留天数未被访问或超过条数上限的条目会被淘汰
+USE_RESULT_CACHE = True
+CACHE_MAX_AGE_DAYS = 30
+CACHE_MAX_ENTRIES = 200000
+# 断点续跑：已完成的结果按条数或时间间隔定期落盘到 JOURNAL_FILE，以 --resume 启动时跳过已完成的文件
+JOURNAL_FLUSH_EVERY = 50
+JOURNAL_FLUSH_INTERVAL = 10.0
+# 单个文件的处理时限 (秒，None 表示不限)：超时的工作进程会被终止并替换，该文件记为 "解析超时"
+TASK_TIMEOUT = 60
+OCR_TASK_TIMEOUT = 120
+# 超时文件改走更便宜的路径重试一次：只识别模板区域、降低渲染分辨率、不再提高分辨率 (None 表示不重试)
+TIMEOUT_RETRY_OPTIONS = {"use_roi": True, "roi_only": True, "dpi": 100, "escalate_dpi": None}
+# 纵向预警：跨作业累计学生的预警次数，同类预警达到 ESCALATE_AFTER 次即升级
+USE_LONGITUDINAL = True
+ESCALATE_AFTER = 3
+# 同时在途的任务数上限 (None 表示按进程数自动确定)，限制流式清单堆积在进程池队列中的任务
+MAX_INFLIGHT_TASKS = None
+# 性能剖析：记录每份文件各阶段 (读取/打开/文本提取/渲染/OCR识别 等) 的耗时、页数与大小，结束时输出热点报告
+# 关闭时计时器为空操作，几乎没有开销；也可以用 --profile 临时开启
+PROFILE_STAGES = False
+PROFILE_TOP_N = 10
+# 进度输出按固定频率刷新 (与结果数量无关)：控制台进度条 / 指标文件 / 进度日志的刷新间隔 (秒)
+PROGRESS_REFRESH = 0.5
+METRICS_INTERVAL = 5.0
+PROGRESS_LOG_INTERVAL = 10.0
+# 服务模式：已结束的任务 (连同结果) 最多保留多少个、保留多少秒，超出后被清除
+SERVE_MAX_FINISHED_JOBS = 100
+SERVE_JOB_TTL = 24 * 3600
+# 分类报表流式导出：xlsx 中每个班级一个工作表；批量模式下分作业报表的并行进程数 (None 表示按 CPU 核心数)
+REPORT_PER_CLASS = False
+EXPORT_WORKERS = None
+
+
+def build_manifest(zip_path, processed_dir, incremental=INCREMENTAL_UNZIP):
+    """
+    函数功能：
+        按照配置的摄入模式，为一个压缩包构建任务清单
+
+    Args:
+        zip_path (str): 压缩包路径
+        processed_dir (str): 解压目录 (免解压模式不使用)
+        incremental (bool): 是否增量解压 (续跑时必须为 True，全量解压会刷新文件的修改时间)
+
+    Returns:
+        tuple: (任务清单 (列表或生成器), 文件总数)；解压失败或压缩包损坏时返回 (None, 0)
+    """
+    try:
+        if INGEST_MODE == "zip":
+            # 免解压：直接由 ZipInfo 构建任务清单，工作进程从压缩包中读取 pdf 字节
+            files_list = scan_zip_members(zip_path)
+            return files_list, len(files_list)
+
+        if STREAM_INGEST:
+            # 流式摄入：生成器边解压边产出任务，总数直接从压缩包中央目录统计
+            print(f"正在流式解压: {os.path.basename(zip_path)} ...")
+            count = count_zip_pdfs(zip_path)
+            files_iter = stream_assignment_files(zip_path, processed_dir, incremental=incremental,
+                                                 threads=UNZIP_THREADS)
+            return files_iter, count
+    except (zipfile.BadZipFile, OSError) as e:
+        # 单个压缩包损坏不影响其他压缩包 (批量模式)
+        print(f"[Error] 压缩包无法读取，已跳过: {os.path.basename(zip_path)} ({e})")
+        return None, 0
+
+    # 解压处理 (IO 密集型，单线程执行)
+    # 注意：内部已通过 src.utils 修复了中文乱码问题
+    if not unzip_file(zip_path, processed_dir, incremental=incremental):
+        return None, 0
+
+    files_list = scan_assignment_files(processed_dir)
+    return files_list, len(files_list)
+
+
+def tag_assignment(files, assignment):
+    """
+    函数功能：
+        为任务清单中的每一条记录标注所属作业 (压缩包名)，批量模式下据此拆分报表
+    """
+    for info in files:
+        info["作业"] = assignment
+        yield info
+
+
+def build_job_manifest(path):
+    """
+    函数功能：
+        常驻服务模式下为一个任务构建清单：压缩包按配置的摄入模式处理，目录则视为已解压的数据直接扫描
+
+    Args:
+        path (str): 压缩包或目录的路径
+
+    Returns:
+        tuple: (任务清单, 文件总数)；路径无效时返回 (None, 0)
+    """
+    if os.path.isdir(path):
+        files_list = scan_assignment_files(path)
+        return files_list, len(files_list)
+    if path.endswith('.zip') and os.path.isfile(path):
+        assignment = os.path.splitext(os.path.basename(path))[0]
+        files, count = build_manifest(path, os.path.join(PROCESSED_DIR, assignment))
+        return (tag_assignment(files, assignment) if files is not None else None), count
+    return None, 0
+
+
+def plan_workers(total_files):
+    """
+    函数功能：
+        资源调度：根据 CPU 核心数、可用内存与单进程常驻内存确定进程数及小文件分块大小
+
+    Args:
+        total_files (int): 本次任务的文件总数
+
+    Returns:
+        dict: 调度计划 (见 src.scheduler.plan_resources)
+    """
+    return plan_resources(total_files, OCR_MEMORY_BUDGET_MB, OCR_MODEL_RSS_MB, TEXT_WORKER_RSS_MB,
+                          reserve_mb=MEMORY_RESERVE_MB)
+
+
+def format_plan(plan, streaming=False):
+    """
+    函数功能：
+        将调度计划格式化为一行摘要，用于运行日志
+
+    Args:
+        plan (dict): 调度计划
+        streaming (bool): 任务清单是否为流式产生 (只能在 STREAM_LOOKAHEAD 窗口内排序)
+    """
+    if not streaming:
+        ordering = "大文件优先"
+    elif STREAM_LOOKAHEAD > 0:
+        ordering = f"大文件优先 (流式，{STREAM_LOOKAHEAD} 份窗口内排序)"
+    else:
+        ordering = "按到达顺序 (流式)"
+    return (f"[调度计划] CPU核心数: {plan['cpu_count']} | 可用内存: {plan['available_mb']:.0f}MB | "
+            f"分诊进程数: {plan['text_workers']} | OCR进程数: {plan['ocr_workers']} | "
+            f"小文件分块: {plan['chunk_size']} | 派发顺序: {ordering}")
+
+
+def create_scheduler(plan, profile=PROFILE_STAGES):
+    """
+    函数功能：
+        按调度计划与全局运行参数创建两级调度器 (尚未进入上下文，进程池未创建)
+    """
+    return TwoStageScheduler(plan["text_workers"], plan["ocr_workers"], preload_ocr=PRELOAD_OCR_MODEL,
+                             ocr_batch_size=OCR_BATCH_SIZE, ocr_flush_timeout=OCR_FLUSH_TIMEOUT,
+                             ocr_options={"use_roi": OCR_USE_ROI, "roi_template": OCR_ROI_TEMPLATE,
+                                          "dpi": OCR_LOW_DPI, "escalate_dpi": OCR_ESCALATE_DPI,
+                                          "min_confidence": OCR_MIN_CONFIDENCE},
+                             max_inflight=MAX_INFLIGHT_TASKS, chunk_size=plan["chunk_size"],
+                             small_file_bytes=SMALL_FILE_BYTES, stream_lookahead=STREAM_LOOKAHEAD,
+                             task_timeout=TASK_TIMEOUT,
+                             ocr_task_timeout=OCR_TASK_TIMEOUT, retry_options=TIMEOUT_RETRY_OPTIONS,
+                             profile=profile)
+
+
+def create_cache():
+    """
+    函数功能：
+        按全局运行参数创建结果缓存；未开启缓存时返回空上下文 (进入后得到 None)
+    """
+    if not USE_RESULT_CACHE:
+        return nullcontext()
+    return ResultCache(CACHE_FILE, PARSER_VERSION, CACHE_MAX_AGE_DAYS, CACHE_MAX_ENTRIES)
+
+
+def create_sink():
+    """
+    函数功能：
+        按全局运行参数创建解析明细的流式写入器；未配置输出文件时返回空上下文 (进入后得到 None)
+    """
+    if not RECORD_FILE:
+        return nullcontext()
+    return ResultSink(RECORD_FILE)
+
+
+def serve(host, port):
+    """
+    函数功能：
+        常驻服务模式：预热进程池与 OCR 模型后，通过本地 HTTP 接口持续接收任务
+    """
+    from src.server import JobRunner, create_app # 仅服务模式需要 flask
+
+    # 服务模式下任务规模未知，不做小文件分块 (按单个文件派发)
+    plan = dict(plan_workers(0), chunk_size=1)
+    print(format_plan(plan, streaming=True))
+    with create_scheduler(plan) as scheduler, create_cache() as cache:
+        print("[服务启动] 正在预热进程池与 OCR 模型...")
+        scheduler.warm_up()
+        runner = JobRunner(scheduler, build_job_manifest, cache=cache,
+                           max_finished_jobs=SERVE_MAX_FINISHED_JOBS, job_ttl=SERVE_JOB_TTL)
+        app = create_app(runner)
+        print(f"[服务启动] 监听 http://{host}:{port}")
+        app.run(host=host, port=port, threaded=True)
+
+
+def parse_args():
+    """
+    函数功能：
+        解析命令行参数
+    """
+    parser = argparse.ArgumentParser(description="EduCoder 预警系统")
+    parser.add_argument("--batch", action="store_true",
+                        help="批量模式：处理 data/raw 下的全部压缩包，共用同一组进程池")
+    parser.add_argument("--resume", action="store_true",
+                        help="断点续跑：跳过上次运行中已完成的文件，只重试未完成及以系统错误/OCR失败结束的文件")
+    parser.add_argument("--serve", action="store_true",
+                        help="常驻服务模式：预热进程池后通过本地 HTTP 接口接收任务")
+    parser.add_argument("--host", default="127.0.0.1", help="服务模式监听地址")
+    parser.add_argument("--port", type=int, default=5000, help="服务模式监听端口")
+    parser.add_argument("--profile", action="store_true",
+                        help="性能剖析：记录逐文件、逐阶段的耗时，结束时输出热点报告")
+    return parser.parse_args()
 
 
 def main():
+    args = parse_args()
+    if args.serve:
+        serve(args.host, args.port)
+        return
 
     print("=== EduCoder 预警系统启动 (Phase 2 Refactored) ===")
     # 1. 数据摄入
     # 1.1 获取源文件
-    zip_path = get_raw_zip_file(RAW_DIR)
-    if not zip_path:
+    if args.batch:
+        zip_paths = get_raw_zip_files(RAW_DIR)
+    else:
+        zip_paths = [p for p in [get_raw_zip_file(RAW_DIR)] if p]
+    if not zip_paths:
         print(f"[Error] data/raw 目录下未找到 ZIP 文件，请检查路径。")
         return
 
-    # 1.2 解压处理 (IO 密集型，单线程执行)
-    # 注意：内部已通过 src.utils 修复了中文乱码问题
-    if not unzip_file(zip_path, PROCESSED_DIR):
-        return
+    # 1.2 构建任务清单：批量模式下每个压缩包解压到各自的子目录，所有清单串联后交给同一组进程池
+    sources, total_files = [], 0
+    for zip_path in zip_paths:
+        assignment = os.path.splitext(os.path.basename(zip_path))[0]
+        processed_dir = os.path.join(PROCESSED_DIR, assignment) if args.batch else PROCESSED_DIR
+        # 续跑时强制增量解压：已解压的文件保持不变，日志中的文件签名才能对得上
+        files, count = build_manifest(zip_path, processed_dir, incremental=INCREMENTAL_UNZIP or args.resume)
+        if files is None:
+            continue
+        sources.append(tag_assignment(files, assignment))
+        total_files += count
 
-    # 1.3 构建任务清单
-    files_list = scan_assignment_files(PROCESSED_DIR)
-    total_files = len(files_list)
+    files_list = itertools.chain.from_iterable(sources)
+    if not (STREAM_INGEST and INGEST_MODE != "zip"):
+        # 清单已全部就绪时展开成列表，调度器才能按文件大小排序派发
+        files_list = list(files_list)
     if total_files == 0:
         print("[Warn] 未扫描到 PDF 文件。")
         return
 
     # 2. 资源调度
-    cpu_count = os.cpu_count() or 1# 获取 CPU 核心数
-    if cpu_count > 4:# 策略：N-2 策略 (高性能机型) 或 N-1 策略 (普通机型)，保底 1 进程
-        workers = cpu_count - 2
-    else:
-        workers = max(1, cpu_count - 1)
+    plan = plan_workers(total_files)
 
-    print(f"\n[系统配置] CPU核心数: {cpu_count} | 启用进程数: {workers}")
-    print(f"[任务启动] 准备处理 {total_files} 份作业数据...")
+    print("\n" + format_plan(plan, streaming=not isinstance(files_list, list)))
+    print(f"[任务启动] 准备处理 {len(zip_paths)} 个压缩包，共 {total_files} 份作业数据...")
     print("-" * 50)
 
     # 3. 并行计算
     start_time = time.time()
-    results = []
-        # 启动进程池
-    with ProcessPoolExecutor(max_workers=workers) as executor:
-        # Map: 将 "基础数据" 映射给 "enrich_data" 函数
-        # enrich_data 会负责调用 pdfplumber/OCR 并合并结果
-        futures = executor.map(enrich_data, files_list)
-
-        # Reduce: 实时收集结果并反馈进度
-        for i, res in enumerate(futures):
-            results.append(res)
-            print_progress(i + 1, total_files, res.get('姓名', 'Unknown'))
+    profile = PROFILE_STAGES or args.profile
+    hot_path = HotPathReport(PROFILE_TOP_N) if profile else None
+
+    # 两级调度：分诊池负责 pdfplumber 文本解析，扫描件转交 OCR 池，结果按文件路径合并
+    # 缓存命中的文件在主进程直接出结果，不进入进程池
+    # 完整明细按完成顺序写入 RECORD_FILE，内存中只保留分类所需的轻量记录
+    journal = RunJournal(JOURNAL_FILE, resume=args.resume,
+                         flush_every=JOURNAL_FLUSH_EVERY, flush_interval=JOURNAL_FLUSH_INTERVAL)
+    with create_scheduler(plan, profile) as scheduler, create_cache() as cache, create_sink() as sink, journal, \
+            ProgressReporter(total_files, PROGRESS_REFRESH, METRICS_FILE, METRICS_INTERVAL, PROGRESS_LOG_FILE,
+                             PROGRESS_LOG_INTERVAL, depth=scheduler.get_queue_depth) as progress:
+        if args.resume:
+            print(f"[断点续跑] 日志中已完成 {journal.completed} 份作业，将跳过这些文件")
+        if not progress.interactive and PROGRESS_LOG_FILE:
+            print(f"[INFO] 标准输出不是终端，进度记录到: {PROGRESS_LOG_FILE}")
+
+        def on_result(res):
+            # Reduce: 写出明细并计数 (按完成顺序，不受慢文件阻塞)，进度由后台线程按固定频率输出
+            if sink is not None:
+                sink.write(res)
+            if hot_path is not None:
+                hot_path.add(res) # 阶段耗时只在完整结果中，裁剪为轻量记录之前汇总
+            progress.update(res)
+
+        results = scheduler.run(files_list, on_result=on_result, cache=cache,
+                                project=slim_row if sink is not None else None, journal=journal)
+        if cache is not None:
+            evicted = cache.evict()
+            cache_stats = cache.stats()
 
     duration = time.time() - start_time
-    print(f"\n\n[执行完毕] 总耗时: {duration:.2f}s | 平均速度: {duration / total_files:.2f}s/file")
+    print(f"\n\n[执行完毕] 总耗时: {duration:.2f}s | 平均速度: {duration / total_files:.2f}s/file | "
+          f"OCR文件数: {scheduler.ocr_count} | 提高分辨率重识别: {scheduler.escalated_count}")
+    if scheduler.timeout_count or scheduler.restart_count:
+        print(f"[容错] 超时文件数: {scheduler.timeout_count} | 进程池重建次数: {scheduler.restart_count}")
+    if cache is not None:
+        print(f"[结果缓存] 命中: {cache_stats['hits']} | 未命中: {cache_stats['misses']} | "
+              f"命中率: {cache_stats['hit_rate']:.1%} | 缓存条目: {cache_stats['entries']} | 本次淘汰: {evicted}")
+    if args.resume:
+        print(f"[断点续跑] 本次跳过: {journal.skipped} | 重新解析: {total_files - journal.skipped}")
+    if sink is not None:
+        print(f"[解析明细] 已写出 {sink.count} 条记录: {sink.path}")
+    if hot_path is not None:
+        print(hot_path.format())
+        if PROFILE_FILE:
+            os.makedirs(os.path.dirname(PROFILE_FILE), exist_ok=True)
+            with open(PROFILE_FILE, 'w', encoding='utf-8') as f:
+                json.dump(hot_path.to_dict(), f, ensure_ascii=False, indent=2)
+            print(f"[性能剖析] 报告已写出: {PROFILE_FILE}")
 
-    # 4. 对学生进行分类
+    # 4. 对学生进行分类 (每份作业独立计算班级基准)
     print("\n[阶段2] 正在构建 Pandas 模型并进行分层预警...")
-    df_result = classify(results)
+    reports = classify_by_assignment(results)
+
+    if USE_LONGITUDINAL:
+        # 纵向预警：只用本次的结果增量更新累计状态，不重新处理历史作业
+        model = LongitudinalModel.load(LONGITUDINAL_FILE, ESCALATE_AFTER)
+        reports = {assignment: model.update(assignment, df) for assignment, df in reports.items()}
+        model.save(LONGITUDINAL_FILE)
+        escalated = sum(int((df['纵向预警'] != '').sum()) for df in reports.values() if not df.empty)
+        print(f"[纵向预警] 已累计 {len(model.assignments)} 份作业 | 本次升级预警: {escalated} 人")
+        baselines = model.class_baselines()
+        if not baselines.empty:
+            print("[纵向预警] 各班级学期耗时基准 (分钟)：")
+            print(baselines.to_string(index=False))
 
     # 设置 Pandas 在控制台的打印格式（解决中英文对齐问题）
     pd.set_option('display.unicode.ambiguous_as_wide', True)
     pd.set_option('display.unicode.east_asian_width', True)
 
-    print("\n=== EduCoder 预警分类结果预览 ===")
-    print(df_result.to_string(index=False))
+    if not args.batch:
+        df_result = next(iter(reports.values()), pd.DataFrame()).drop(columns='作业', errors='ignore')
+        print("\n=== EduCoder 预警分类结果预览 ===")
+        print(df_result.to_string(index=False))
+    else:
+        # 批量模式：逐份作业给出标签分布，并输出分作业报表与汇总报表
+        print("\n=== EduCoder 预警分类结果汇总 ===")
+        for assignment, df_result in reports.items():
+            counts = df_result['分类标签'].value_counts() if not df_result.empty else {}
+            summary = " | ".join(f"{label}: {n}" for label, n in counts.items())
+            print(f"[{assignment}] 共 {len(df_result)} 人 | {summary}")
+        # 汇总报表直接写到 OUTPUT_FILE (为 None 时不生成)，不再另外生成一份内容相同的报表
+        save_assignment_reports(reports, REPORT_DIR, per_class=REPORT_PER_CLASS, workers=EXPORT_WORKERS,
+                                combined_path=OUTPUT_FILE)
+
+    if OUTPUT_FILE and not args.batch:
+        # 全部作业的分类报表：逐份作业流式写出，不在内存中拼接整张表
+        save_report(reports, OUTPUT_FILE, per_class=REPORT_PER_CLASS)
+
+    if COLUMNAR_FILE:
+        # 列式结果库：分类类型 + float32，供看板毫秒级加载
+        save_columnar(reports, COLUMNAR_FILE)
 
     print("\n=== EduCoder 预警系统启动 (Phase 2 结束) ===")
 
@@ -0,0 +1,175 @@
+# src/cache.py
+"""
+模块功能：
+    结果缓存层。以 "pdf 内容哈希 + 解析器版本" 为键，把 parse_pdf_report 的输出持久化到本地 SQLite 文件中。
+    每小时一次的重复运行里，绝大多数作业并没有变化，命中缓存的文件无需再打开 pdf。
+
+说明：
+    缓存只在主进程中读写 (单写者)，工作进程不接触数据库，避免多进程并发写 SQLite 带来的锁竞争
+    解析逻辑发生变化时，需要提升 src.pdf_handler.PARSER_VERSION，旧缓存会自然失效并在淘汰时被清理
+    "系统错误"、"OCR失败"、"解析超时" 等可能是偶发故障导致的结果不会写入缓存，下次运行会重新解析
+
+依赖关系：
+    sqlite3: 本地持久化
+    hashlib: 计算文件内容哈希
+    json: 序列化结果字典
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+
+# 这些状态可能由偶发故障产生 (模型加载失败、进程异常等)，不缓存
+TRANSIENT_STATUSES = ("系统错误", "OCR失败", "Error", "解析超时")
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    函数功能：
+        分块读取文件并计算 sha1，避免一次把大文件读入内存
+
+    Args:
+        path (str): 文件路径
+        chunk_size (int): 每次读取的字节数
+
+    Returns:
+        str: 十六进制的哈希值
+    """
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def content_digest(file_info: dict) -> str:
+    """
+    函数功能：
+        取一份作业的内容指纹：免解压模式直接使用压缩包成员的 CRC 与大小 ('内容校验')，否则计算文件哈希
+
+    Args:
+        file_info (dict): 学生基础信息字典
+
+    Returns:
+        str: 内容指纹
+    """
+    return file_info.get("内容校验") or file_digest(file_info["文件路径"])
+
+
+class ResultCache:
+    """
+    基于 SQLite 的解析结果缓存，支持命中统计和按时间/条数淘汰：
+
+        with ResultCache(db_path, parser_version) as cache:
+            hit = cache.get(digest)
+            cache.put(digest, result_fields)
+    """
+
+    def __init__(self, db_path: str, parser_version: str, max_age_days: float = 30, max_entries: int = 200000):
+        self.db_path = db_path
+        self.parser_version = parser_version
+        self.max_age_days = max_age_days
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._uncommitted = 0
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        # 常驻服务模式下由后台任务线程使用，但同一时刻只有一个线程读写
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, payload TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_accessed ON results(accessed)")
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._conn.commit()
+        self._conn.close()
+        self._conn = None
+        return False
+
+    def _key(self, digest: str) -> str:
+        return f"{self.parser_version}:{digest}"
+
+    def get(self, digest: str):
+        """
+        函数功能：
+            查询缓存，并刷新该条目的访问时间 (用于按时间淘汰)
+
+        Args:
+            digest (str): 文件内容哈希
+
+        Returns:
+            dict | None: 缓存的解析结果，未命中返回 None
+        """
+        key = self._key(digest)
+        row = self._conn.execute("SELECT payload FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+        self._maybe_commit()
+        return json.loads(row[0])
+
+    def put(self, digest: str, result: dict):
+        """
+        函数功能：
+            写入一条解析结果；偶发故障产生的结果会被跳过
+
+        Args:
+            digest (str): 文件内容哈希
+            result (dict): parse_pdf_report 输出的字段
+        """
+        if result.get("状态") in TRANSIENT_STATUSES:
+            return
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO results (key, payload, created, accessed) VALUES (?, ?, ?, ?)",
+            (self._key(digest), json.dumps(result, ensure_ascii=False), now, now)
+        )
+        self._maybe_commit()
+
+    def _maybe_commit(self, every: int = 200):
+        # 攒一批再提交，避免每条记录都触发一次磁盘同步
+        self._uncommitted += 1
+        if self._uncommitted >= every:
+            self._conn.commit()
+            self._uncommitted = 0
+
+    def evict(self) -> int:
+        """
+        函数功能：
+            淘汰过期条目 (超过 max_age_days 未被访问)，再按最近访问时间裁剪到 max_entries 条以内
+
+        Returns:
+            int: 被删除的条目数
+        """
+        cutoff = time.time() - self.max_age_days * 86400
+        removed = self._conn.execute("DELETE FROM results WHERE accessed < ?", (cutoff,)).rowcount
+        removed += self._conn.execute(
+            "DELETE FROM results WHERE key NOT IN (SELECT key FROM results ORDER BY accessed DESC LIMIT ?)",
+            (self.max_entries,)
+        ).rowcount
+        self._conn.commit()
+        return removed
+
+    def stats(self) -> dict:
+        """
+        函数功能：
+            返回本次运行的命中统计及缓存当前的条目数
+        """
+        total = self.hits + self.misses
+        entries = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+        }
@@ -0,0 +1,143 @@
+# src/checkpoint.py
+"""
+模块功能：
+    断点续跑。运行过程中把每份已完成作业的解析结果追加写入本地日志文件 (JSONL)，
+    运行被中断 (崩溃、被杀、断电) 后，以 --resume 重新启动即可跳过日志中已完成的文件。
+
+说明：
+    日志以 "文件路径 + 文件签名" 判断记录是否仍然有效：签名为文件大小与修改时间 (免解压模式为压缩包成员的 CRC 与大小)，
+    文件被替换后签名不同，会重新解析
+    "系统错误"、"OCR失败"、"解析超时" 等偶发故障的记录不会被复用，续跑时只重试这些文件
+    写入按条数或时间间隔定期落盘 (flush + fsync)，进程被强制结束时最多丢失最近一个周期的记录
+    与结果缓存 (src.cache) 的区别：缓存按内容哈希跨运行复用，需要读取整份文件计算哈希；日志只服务于同一批任务的续跑，只需 stat
+
+依赖关系：
+    json: 日志逐行序列化
+    src.cache: 偶发故障状态列表
+"""
+import os
+import json
+import time
+
+from src.cache import TRANSIENT_STATUSES
+
+
+def file_signature(file_info: dict) -> str:
+    """
+    函数功能：
+        取一份作业的文件签名：免解压模式直接使用压缩包成员的 CRC 与大小，否则为磁盘文件的大小与修改时间
+
+    Args:
+        file_info (dict): 学生基础信息字典
+
+    Returns:
+        str: 文件签名；文件不存在时返回空字符串
+    """
+    if "内容校验" in file_info:
+        return file_info["内容校验"]
+    try:
+        st = os.stat(file_info["文件路径"])
+    except OSError:
+        return ""
+    return f"{st.st_size}-{int(st.st_mtime)}"
+
+
+class RunJournal:
+    """
+    运行日志，以上下文管理器的方式使用：
+
+        with RunJournal(path, resume=True) as journal:
+            done = journal.get(file_info)   # 已完成的解析结果或 None
+            journal.record(file_info, result_fields)
+    """
+
+    def __init__(self, path: str, resume: bool = False, flush_every: int = 50, flush_interval: float = 10.0):
+        """
+        Args:
+            path (str): 日志文件路径
+            resume (bool): True 时载入已有日志并在其后追加；False 时清空日志重新开始
+            flush_every (int): 每写入多少条记录落盘一次
+            flush_interval (float): 距上次落盘超过多少秒也会落盘
+        """
+        self.path = path
+        self.resume = resume
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.skipped = 0 # 本次运行因已完成而跳过的文件数
+        self._done = {}
+        self._file = None
+        self._unflushed = 0
+        self._last_flush = 0.0
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if self.resume:
+            self._done = self._load()
+        self._file = open(self.path, 'a' if self.resume else 'w', encoding='utf-8')
+        self._last_flush = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._flush()
+        self._file.close()
+        self._file = None
+        return False
+
+    def _load(self) -> dict:
+        # 后写入的记录覆盖先写入的 (同一文件先失败、续跑时重试成功)
+        done = {}
+        if not os.path.exists(self.path):
+            return done
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue # 进程中断时最后一行可能只写了一半
+                done[entry["路径"]] = entry
+        return done
+
+    @property
+    def completed(self) -> int:
+        """日志中已完成 (且不需要重试) 的文件数"""
+        return sum(1 for e in self._done.values() if e["结果"].get("状态") not in TRANSIENT_STATUSES)
+
+    def get(self, file_info: dict):
+        """
+        函数功能：
+            查询一份作业是否已在日志中完成；签名不一致或上次以偶发故障结束的文件需要重新解析
+
+        Args:
+            file_info (dict): 学生基础信息字典
+
+        Returns:
+            dict | None: 已完成的解析结果字段，需要重新解析时返回 None
+        """
+        entry = self._done.get(file_info["文件路径"])
+        if entry is None or entry["签名"] != file_signature(file_info):
+            return None
+        if entry["结果"].get("状态") in TRANSIENT_STATUSES:
+            return None
+        self.skipped += 1
+        return entry["结果"]
+
+    def record(self, file_info: dict, result: dict):
+        """
+        函数功能：
+            追加一条完成记录，并按条数或时间间隔落盘
+
+        Args:
+            file_info (dict): 学生基础信息字典 (用于计算签名)
+            result (dict): parse_pdf_report 输出的字段
+        """
+        entry = {"路径": file_info["文件路径"], "签名": file_signature(file_info), "结果": result}
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._unflushed += 1
+        if self._unflushed >= self.flush_every or time.time() - self._last_flush >= self.flush_interval:
+            self._flush()
+
+    def _flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unflushed = 0
+        self._last_flush = time.time()
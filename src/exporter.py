@@ -3,47 +3,351 @@
 模块功能：
     本模块专门负责将处理好的内存数据序列化为外部文件格式（如 Excel, CSV, JSON）。。
 
+说明：
+    分类报表 (xlsx / CSV / JSONL) 逐份作业、逐行流式写出：xlsx 使用 openpyxl 的只写模式，不拼接整张大表，
+    可选每个班级一个工作表；批量模式下各份作业的报表并行生成
+    另提供流式结果写入器 (CSV / JSONL / Parquet)：
+    调度器每完成一份作业就写入一行，解析明细不必在内存中攒到最后，进程被中断时已写入的部分也不会丢失
+
 依赖关系：
-    pandas: 用于数据帧构建和 Excel 写入
+    pandas: 分类结果的数据帧
+    openpyxl: 以只写模式流式写入 Excel 报表
+    csv / json: 流式写入 CSV 与 JSONL
+    pyarrow: 写入 Parquet / Feather (流式明细与列式结果库)
+    src.layer: 列式存储前的类型压缩
 """
 
+import io
+import os
+import csv
+import json
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 
+from src.layer import compact_frame
+
+# 流式写入的解析明细字段 (固定列，免解压模式下的压缩包内部字段不写出)
+RECORD_FIELDS = ['作业', '班级', '学号', '姓名', '状态', '耗时', '识别方式', '异常备注', '文件路径']
+
+
+def _cell(value):
+    # 缺失值 (NaN) 写为空单元格
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def _json_value(value):
+    # numpy 标量转为 Python 原生类型
+    return value.item() if hasattr(value, 'item') else str(value)
+
+
+def _report_frames(frames):
+    # 逐份作业排序 (优先班级，次优先学号)，不把多份作业拼成一张大表
+    for df in frames:
+        if df.empty:
+            continue
+        if '班级' in df.columns and '学号' in df.columns:
+            df = df.sort_values(by=['班级', '学号'])
+        yield df
+
+
+def _sheet_title(name, used: set) -> str:
+    # Excel 工作表名最长 31 个字符，不能包含 []:*?/\，且不能重名
+    title = "".join("_" if ch in '[]:*?/\\' else ch for ch in str(name))[:31] or "未知班级"
+    base, i = title, 1
+    while title in used:
+        i += 1
+        title = f"{base[:31 - len(str(i)) - 1]}_{i}"
+    used.add(title)
+    return title
+
+
+def _write_xlsx(frames, output, per_class: bool) -> int:
+    from openpyxl import Workbook # 只写模式：逐行写入临时文件，内存占用与行数无关
+
+    workbook = Workbook(write_only=True)
+    sheets, titles, count = {}, set(), 0
+
+    def sheet(key, columns):
+        if key not in sheets:
+            ws = workbook.create_sheet(_sheet_title("预警结果" if key is None else key, titles))
+            ws.append(columns)
+            sheets[key] = ws
+        return sheets[key]
+
+    for df in frames:
+        columns = list(df.columns)
+        if per_class:
+            parts = df.groupby('班级', observed=True, sort=True, dropna=False)
+        else:
+            parts = [(None, df)]
+        for key, part in parts:
+            key = "未知班级" if per_class and pd.isna(key) else key
+            ws = sheet(key, columns)
+            for row in part.itertuples(index=False, name=None):
+                ws.append([_cell(v) for v in row])
+            count += len(part)
+
+    if not sheets:
+        workbook.create_sheet("预警结果") # 没有任何工作表的工作簿无法保存
+    workbook.save(output)
+    return count
+
+
+def _write_csv(frames, output, per_class: bool) -> int:
+    count, writer = 0, None
+    with _open_text(output, 'utf-8-sig', newline='') as f: # 带 BOM，Excel 直接打开不会出现中文乱码
+        for df in frames:
+            if writer is None:
+                writer = csv.writer(f)
+                writer.writerow(df.columns)
+            for row in df.itertuples(index=False, name=None):
+                writer.writerow(["" if v is None else v for v in map(_cell, row)])
+            count += len(df)
+    return count
+
+
+def _write_jsonl(frames, output, per_class: bool) -> int:
+    count = 0
+    with _open_text(output, 'utf-8') as f:
+        for df in frames:
+            columns = list(df.columns)
+            for row in df.itertuples(index=False, name=None):
+                record = dict(zip(columns, map(_cell, row)))
+                f.write(json.dumps(record, ensure_ascii=False, default=_json_value) + "\n")
+            count += len(df)
+    return count
+
 
-def save_to_excel(data: list, output_path: str):
+@contextmanager
+def _open_text(output, encoding, newline=None):
+    # output 可以是路径，也可以是已打开的二进制流 (例如 HTTP 响应的 BytesIO)，后者写完后不关闭
+    if isinstance(output, (str, os.PathLike)):
+        with open(output, 'w', encoding=encoding, newline=newline) as f:
+            yield f
+        return
+    f = io.TextIOWrapper(output, encoding=encoding, newline=newline)
+    try:
+        yield f
+    finally:
+        f.flush()
+        f.detach()
+
+
+_REPORT_WRITERS = {"xlsx": _write_xlsx, "csv": _write_csv, "jsonl": _write_jsonl}
+
+
+def write_report(frames, output, fmt: str = None, per_class: bool = False) -> int:
     """
     函数功能：
-        将包含学生数据的字典列表导出为标准 Excel 报表。
+        以流式方式写出分类结果报表：逐份作业、逐行写入，不拼接整张大表，内存占用只与单份作业的规模有关
 
     Args:
-        data (list[dict]): 学生数据列表。
-        output_path (str): 输出文件的绝对路径。
+        frames (iterable[pd.DataFrame]): 分类结果 (通常是 classify_by_assignment 输出的各份作业)，列需一致
+        output (str | BinaryIO): 输出路径或二进制流
+        fmt (str): 输出格式 xlsx / csv / jsonl，None 表示按 output 的扩展名确定
+        per_class (bool): 仅 xlsx 有效，每个班级一个工作表
+
+    Returns:
+        int: 写出的行数
     """
-    if not data:
+    fmt = (fmt or os.path.splitext(output)[1].lstrip('.')).lower()
+    if fmt not in _REPORT_WRITERS:
+        raise ValueError(f"不支持的报表格式: {fmt} (可选 {', '.join(_REPORT_WRITERS)})")
+    return _REPORT_WRITERS[fmt](_report_frames(frames), output, per_class)
+
+
+def save_report(reports: dict, output_path: str, per_class: bool = False):
+    """
+    函数功能：
+        将全部作业的分类结果导出为一份报表 (格式按扩展名：.xlsx / .csv / .jsonl)。
+
+    Args:
+        reports (dict[str, pd.DataFrame]): {作业名: 分类结果}
+        output_path (str): 输出文件路径
+        per_class (bool): xlsx 报表中每个班级一个工作表
+    """
+    if not reports:
         print("[WARN] 没有数据可供导出。")
         return
 
     try:
-        df = pd.DataFrame(data)
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        count = write_report(reports.values(), output_path, per_class=per_class)
+        print(f"[INFO] 报表已生成: {output_path} ({count} 行)")
 
-        # 定义列顺序 (显式定义，保证报表美观)
-        columns_order = ['班级', '学号', '姓名', '状态', '耗时', '识别方式', '是否有异常', '异常备注', '文件路径']
+    except Exception as e:
+        print(f"[ERROR] 报表导出失败: {e}")
 
-        # 补全缺失列
-        for col in columns_order:
-            if col not in df.columns:
-                df[col] = ""
 
-        # 排序：优先班级，次优先学号
-        if '班级' in df.columns and '学号' in df.columns:
-            df.sort_values(by=['班级', '学号'], inplace=True)
+def save_assignment_reports(reports: dict, output_dir: str, per_class: bool = False, workers: int = None,
+                            combined_path: str = None):
+    """
+    函数功能：
+        批量模式下输出分类结果：每份作业一个 Excel 报表，可另附一份包含全部作业的汇总报表。
+        各份作业的报表在进程池中并行生成，汇总报表同时在主进程中生成
+
+    Args:
+        reports (dict[str, pd.DataFrame]): {作业名: 分类结果}
+        output_dir (str): 输出目录
+        per_class (bool): 每个班级一个工作表
+        workers (int): 并行导出的进程数，None 表示按 CPU 核心数确定，1 表示在主进程中依次导出
+        combined_path (str): 汇总报表的路径 (格式按扩展名：.xlsx / .csv / .jsonl)，None 表示不生成汇总报表
+    """
+    if not reports:
+        print("[WARN] 没有数据可供导出。")
+        return
+
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        if combined_path:
+            os.makedirs(os.path.dirname(combined_path) or ".", exist_ok=True)
+        workers = min(workers or os.cpu_count() or 1, len(reports))
+
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(write_report, [df], os.path.join(output_dir, f"{assignment}.xlsx"),
+                                       per_class=per_class)
+                           for assignment, df in reports.items()]
+                if combined_path:
+                    write_report(reports.values(), combined_path, per_class=per_class)
+                for future in futures:
+                    future.result()
+        else:
+            for assignment, df in reports.items():
+                write_report([df], os.path.join(output_dir, f"{assignment}.xlsx"), per_class=per_class)
+            if combined_path:
+                write_report(reports.values(), combined_path, per_class=per_class)
+        print(f"[INFO] 已生成 {len(reports)} 份作业报表: {output_dir}"
+              + (f" | 汇总报表: {combined_path}" if combined_path else ""))
+
+    except Exception as e:
+        print(f"[ERROR] 报表导出失败: {e}")
+
+
+def save_columnar(reports: dict, output_path: str):
+    """
+    函数功能：
+        把全部作业的分类结果拼成一张表，压缩类型后写入列式文件 (.parquet 或 .feather)，
+        看板等下游程序直接加载该文件，无需重新解析 Excel 报表
 
-        # 裁剪并重排
-        df = df[columns_order]
+    Args:
+        reports (dict[str, pd.DataFrame]): {作业名: 分类结果}
+        output_path (str): 输出文件路径，按扩展名选择格式
+    """
+    frames = [df for df in reports.values() if not df.empty]
+    if not frames:
+        print("[WARN] 没有数据可供导出。")
+        return
 
-        # 导出 (index=False 去掉 dataframe 自带的行号)
-        df.to_excel(output_path, index=False)
-        print(f"[INFO] 报表已生成: {output_path}")
+    try:
+        combined = compact_frame(pd.concat(frames, ignore_index=True))
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        if output_path.endswith('.feather'):
+            combined.to_feather(output_path)
+        else:
+            combined.to_parquet(output_path, index=False)
+        print(f"[INFO] 列式结果已生成: {output_path} ({combined.memory_usage(deep=True).sum() / 1024:.0f}KB 内存占用)")
 
     except Exception as e:
-        print(f"[ERROR] Excel 导出失败: {e}")
\ No newline at end of file
+        print(f"[ERROR] 列式结果导出失败: {e}")
+
+
+class _CsvSink:
+    def __init__(self, path):
+        # utf-8-sig 带 BOM，Excel 直接打开不会出现中文乱码
+        self._file = open(path, 'w', newline='', encoding='utf-8-sig')
+        self._writer = csv.DictWriter(self._file, fieldnames=RECORD_FIELDS, extrasaction='ignore')
+        self._writer.writeheader()
+
+    def write(self, row):
+        self._writer.writerow({k: _text(row.get(k)) for k in RECORD_FIELDS})
+
+    def close(self):
+        self._file.close()
+
+
+class _JsonlSink:
+    def __init__(self, path):
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, row):
+        record = {k: _text(row.get(k)) for k in RECORD_FIELDS}
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetSink:
+    def __init__(self, path, row_group_size=1000):
+        import pyarrow as pa # 可选依赖，仅 Parquet 输出需要
+        import pyarrow.parquet as pq
+        self._pa = pa
+        self._schema = pa.schema([(k, pa.string()) for k in RECORD_FIELDS])
+        self._writer = pq.ParquetWriter(path, self._schema)
+        self._row_group_size = row_group_size
+        self._buffer = []
+
+    def write(self, row):
+        # Parquet 按行组写入，攒够一个行组再落盘
+        self._buffer.append({k: _text(row.get(k)) for k in RECORD_FIELDS})
+        if len(self._buffer) >= self._row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            self._writer.write_table(self._pa.Table.from_pylist(self._buffer, schema=self._schema))
+            self._buffer = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+_SINKS = {".csv": _CsvSink, ".jsonl": _JsonlSink, ".parquet": _ParquetSink}
+
+
+def _text(value):
+    return "" if value is None else str(value)
+
+
+class ResultSink:
+    """
+    流式结果写入器，按文件扩展名选择格式 (.csv / .jsonl / .parquet)：
+
+        with ResultSink(path) as sink:
+            sink.write(result_dict)
+    """
+
+    def __init__(self, path: str):
+        ext = os.path.splitext(path)[1].lower()
+        if ext not in _SINKS:
+            raise ValueError(f"不支持的输出格式: {ext} (可选 {', '.join(_SINKS)})")
+        self.path = path
+        self.count = 0
+        self._sink_cls = _SINKS[ext]
+        self._sink = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._sink = self._sink_cls(self.path)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._sink.close()
+        self._sink = None
+        return False
+
+    def write(self, row: dict):
+        """
+        函数功能：
+            写入一份作业的解析结果 (只写出 RECORD_FIELDS 中的列)
+
+        Args:
+            row (dict): enrich_data 输出的结果字典
+        """
+        self._sink.write(row)
+        self.count += 1
@@ -9,11 +9,32 @@
             通关状态为未完成的，也是同样的预警，没有按时完成作业
 
 依赖关系：
-    pandas: 利用其的 dataframe 作为存储的数据结构，且 pandas 计算中位数比较方便快捷
-    utils：使用该模块的parse_time_to_minutes将字符串转化为分钟数便于计算
+    pandas: 利用其的 dataframe 作为存储的数据结构，且 pandas 计算中位数比较方便快捷；重复的文本列使用 category 类型节省内存
+    utils：使用该模块的parse_durations将整列字符串转化为分钟数便于计算 (每个不重复的耗时只解析一次)
 """
+import numpy as np
 import pandas as pd
-from src.utils import parse_time_to_minutes
+from src.utils import parse_durations
+
+# 分类只需要这些字段，流式运行时内存中只保留它们 (见 slim_row)
+CLASSIFY_FIELDS = ('作业', '班级', '学号', '姓名', '状态', '耗时')
+
+# 取值高度重复的列使用分类类型 (category)，只存一份字符串及整数编码
+CATEGORY_COLUMNS = ['作业', '班级', '状态', '分类标签', '纵向预警']
+
+
+def slim_row(res: dict) -> dict:
+    """
+    功能：
+    把一份完整的解析结果裁剪为分类所需的轻量记录，完整明细已由结果写入器落盘
+
+    Args：
+    res(dict): enrich_data 输出的结果字典
+
+    Return：
+    dict：只包含 CLASSIFY_FIELDS 的字典
+    """
+    return {k: res[k] for k in CLASSIFY_FIELDS if k in res}
 
 
 def classify(results: list) -> pd.DataFrame:
@@ -32,7 +53,7 @@ def classify(results: list) -> pd.DataFrame:
 
     #1.载入原始数据
     df = pd.DataFrame(results)
-    df['耗时(分钟)'] = df['耗时'].apply(parse_time_to_minutes)
+    df['耗时(分钟)'] = parse_durations(df['耗时'])
     df['分类标签'] = '正常'  # 默认状态
 
     #2.划定“高质量有效数据”用于计算基准
@@ -42,23 +63,21 @@ def classify(results: list) -> pd.DataFrame:
 
     #3.计算每个班级的动态边界
     if not valid_data.empty:
-        baselines = valid_data.groupby('班级')['耗时(分钟)'].agg(# 分组计算第一四分位数和第三四分位数
-            Q1=lambda x: x.quantile(0.25),
-            Q3=lambda x: x.quantile(0.75),
-            Median = 'median'
-        ).reset_index()
+        grouped = valid_data.groupby('班级')['耗时(分钟)']
+        quartiles = grouped.quantile([0.25, 0.75]).unstack()# 分组计算第一四分位数和第三四分位数 (内置实现，无逐组回调)
+        quartiles = quartiles.reindex(columns=[0.25, 0.75])# 全部有效数据都没有班级时分组为空，补齐列后由下方的默认边界兜底
+        q1, q3 = quartiles[0.25], quartiles[0.75]
+        median = grouped.median()
 
         #计算四分位距和边界
-        baselines['IQR'] = baselines['Q3'] - baselines['Q1']
-        baselines['下界_lower'] = baselines.apply(
-            lambda x: max(20.0, x['Median'] * 0.35) if x['Median'] > 40 else x['Median'] * 0.4,
-            axis=1
-        )
-        baselines['上界_upper'] = baselines['Q3'] + 1.5 * baselines['IQR']
-        baselines.loc[baselines['IQR'] == 0, '上界_upper'] += 60.0
-
-        #将算好的边界贴回原表格中对应的班级
-        df = df.merge(baselines[['班级', '下界_lower', '上界_upper']], on='班级', how='left')
+        iqr = q3 - q1
+        lower = pd.Series(np.where(median > 40, np.maximum(20.0, median * 0.35), median * 0.4), index=median.index)
+        upper = q3 + 1.5 * iqr
+        upper[iqr == 0] += 60.0
+
+        #将算好的边界按班级广播回原表格 (map 按索引对齐，无需 merge 复制整张表)
+        df['下界_lower'] = df['班级'].map(lower)
+        df['上界_upper'] = df['班级'].map(upper)
     else:
         #极端情况：如果全校没有一个正常数据
         df['下界_lower'] = 10.0
@@ -82,8 +101,50 @@ def classify(results: list) -> pd.DataFrame:
     df.loc[df['状态'] == '截止后通关', '分类标签'] = '黄色 (截止后补交作业)'
 
         # E. 未完成
-    df.loc[df['状态'].isin(['未通关', '未开启', '无法判定', 'OCR失败']), '分类标签'] = '红色 (未完成)'
+    df.loc[df['状态'].isin(['未通关', '未开启', '无法判定', 'OCR失败', '解析超时']), '分类标签'] = '红色 (未完成)'
 
-    # 5. 精简列并返回
+    # 5. 精简列并返回 (班级/状态/标签转为分类类型，耗时保持 float64 以免报表中出现精度尾数)
     final_columns = ['姓名', '学号', '班级', '耗时(分钟)', '状态', '分类标签']
-    return df[final_columns]
\ No newline at end of file
+    return df[final_columns].astype({'班级': 'category', '状态': 'category', '分类标签': 'category'})
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    功能：
+    把分类结果转为紧凑的列式类型，用于长期保存与看板加载：重复的文本列转为 category，耗时转为 float32
+
+    Args：
+    df(pd.DataFrame): classify / 纵向预警输出的结果 (可以是多份作业拼接后的表)
+
+    Return：
+    pd.DataFrame：类型压缩后的新表
+    """
+    dtypes = {col: 'category' for col in CATEGORY_COLUMNS if col in df.columns}
+    if '耗时(分钟)' in df.columns:
+        dtypes['耗时(分钟)'] = 'float32'
+    if '累计预警次数' in df.columns:
+        dtypes['累计预警次数'] = 'int32'
+    return df.astype(dtypes)
+
+
+def classify_by_assignment(results: list) -> dict:
+    """
+    功能：
+    按 '作业' 字段拆分结果，每份作业独立计算班级基准并分类 (不同作业的耗时不可直接比较)
+
+    Args：
+    results(list): 识别完 pdf得到的 dictionary 列表，可能混有多份作业
+
+    Return：
+    dict：{作业名: 带 '作业' 列的分类结果 DataFrame}，按作业首次出现的顺序排列
+    """
+    groups = {}
+    for row in results:
+        groups.setdefault(row.get('作业', ''), []).append(row)
+
+    reports = {}
+    for assignment, rows in groups.items():
+        df = classify(rows)
+        df.insert(0, '作业', assignment)
+        reports[assignment] = df
+    return reports
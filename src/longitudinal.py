@@ -0,0 +1,271 @@
+# src/longitudinal.py
+"""
+模块功能：
+    纵向预警模型。跨作业维护每个班级、每个学生的累计统计，反复被标记为 "学习吃力" 或 "疑似秒刷" 的学生会被升级预警。
+
+说明：
+    班级的历史耗时分布使用 P² 流式分位数估计 (Jain & Chlamtac, 1985)：样本较少时精确计算，之后每个分位数只保存 5 个标记点，
+    新增一条数据 O(1)，不需要保存或重新排序整个学期的历史数据
+    学生只保存每份作业的标签及各类标签的计数，新增一份作业的代价与这份作业的人数成正比
+    学生以学号为键，跨作业换了班级文件夹 (例如 未分班 → 计科1班) 也能接着累计；
+    学号缺失 (Unknown / Error) 时退回以 班级 + 姓名 为键，这些学生之间不会被合并
+    同一份作业重复纳入时 (例如每小时一次的定时任务)，学生的标签以最新一次为准；
+    班级分布只补入这份作业中尚未计入的学生 (流式分位数无法撤销样本，已计入学生的耗时变化不会回写)
+    状态持久化为一个 json 文件，下次运行接着累计
+
+依赖关系：
+    json: 状态持久化
+    pandas: 读取 classify 的输出并追加纵向预警列
+"""
+import os
+import json
+import bisect
+import pandas as pd
+
+# 参与纵向累计的单次预警标签
+STRUGGLE_LABEL = '黄色 (学习吃力)'
+RUSH_LABEL = '红色 (疑似秒刷)'
+# _build_student_info 在文件名中没有学号 / 解析出错时填入的占位学号
+MISSING_IDS = ("Unknown", "Error")
+
+
+class P2Quantile:
+    """
+    单个分位数的 P² 流式估计器。前 EXACT_LIMIT 个样本原样保存并精确计算 (与 numpy.quantile 一致)，
+    超过之后用这些样本初始化 5 个标记点，此后只维护标记点的高度与位置
+    """
+
+    EXACT_LIMIT = 32 # 样本较少时标记点还没有收敛，Q1 / Q3 会严重偏向中位数，因此先精确计算
+
+    def __init__(self, p: float):
+        self.p = p
+        self.samples = [] # 精确阶段的有序样本，标记点初始化后清空
+        self.heights = [] # 标记点高度 q[0..4]
+        self.positions = [] # 标记点的实际位置 n[0..4]
+        self.desired = [] # 标记点的理想位置
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+        self.count = 0
+
+    def add(self, x: float):
+        self.count += 1
+        q = self.heights
+        if not q:
+            bisect.insort(self.samples, x)
+            if len(self.samples) > self.EXACT_LIMIT:
+                self._init_markers()
+            return
+
+        # 1. 找到 x 所在的区间，并更新两端的极值
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if q[i] <= x < q[i + 1])
+
+        n = self.positions
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # 2. 中间三个标记点偏离理想位置时，用抛物线 (失败时退回线性) 插值调整高度
+        for i in range(1, 4):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                qp = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if not q[i - 1] < qp < q[i + 1]:
+                    qp = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = qp
+                n[i] += d
+
+    def _init_markers(self):
+        # 以精确样本中 0、p/2、p、(1+p)/2、1 分位处的样本作为标记点，位置取其秩 (从 1 开始)
+        samples = self.samples
+        last = len(samples) - 1
+        ranks = [round(last * f) for f in self.increments]
+        self.heights = [samples[r] for r in ranks]
+        self.positions = [r + 1 for r in ranks]
+        self.desired = [1 + last * f for f in self.increments]
+        self.samples = []
+
+    def value(self) -> float:
+        """
+        函数功能：
+            返回当前的分位数估计；精确阶段按线性插值计算 (与 numpy / pandas 的 quantile 一致)
+        """
+        if self.heights:
+            return self.heights[2]
+        q = self.samples
+        if not q:
+            return float('nan')
+        pos = (len(q) - 1) * self.p
+        lo = int(pos)
+        hi = min(lo + 1, len(q) - 1)
+        return q[lo] + (q[hi] - q[lo]) * (pos - lo)
+
+    def to_dict(self) -> dict:
+        return {"p": self.p, "samples": self.samples, "heights": self.heights, "positions": self.positions,
+                "desired": self.desired, "count": self.count}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "P2Quantile":
+        sketch = cls(data["p"])
+        sketch.samples = data["samples"]
+        sketch.heights = data["heights"]
+        sketch.positions = data["positions"]
+        sketch.desired = data["desired"]
+        sketch.count = data["count"]
+        return sketch
+
+
+class LongitudinalModel:
+    """
+    跨作业的纵向预警模型：
+
+        model = LongitudinalModel.load(path)
+        df = model.update(assignment, classify(rows))   # 追加 '累计预警次数'、'纵向预警' 两列
+        model.save(path)
+    """
+
+    QUANTILES = (0.25, 0.5, 0.75)
+
+    def __init__(self, escalate_after: int = 3):
+        """
+        Args:
+            escalate_after (int): 同类预警累计达到多少次即升级
+        """
+        self.escalate_after = escalate_after
+        self.assignments = [] # 已纳入的作业 (按纳入顺序)
+        self.classes = {} # 班级 -> {"作业": [已计入的作业], "sketches": [P2Quantile, ...]}
+        self.students = {} # 学号 (缺失时为 班级|姓名) -> {"姓名", "班级", "标签": {作业: 标签}, "计入": [作业], "吃力": n, "秒刷": n}
+
+    @classmethod
+    def load(cls, path: str, escalate_after: int = 3) -> "LongitudinalModel":
+        """
+        函数功能：
+            从 json 文件恢复模型状态；文件不存在时返回空模型
+        """
+        model = cls(escalate_after)
+        if not os.path.exists(path):
+            return model
+        with open(path, encoding='utf-8') as f:
+            state = json.load(f)
+        model.assignments = state["assignments"]
+        model.students = state["students"]
+        model.classes = {
+            name: {"作业": c["作业"], "sketches": [P2Quantile.from_dict(s) for s in c["sketches"]]}
+            for name, c in state["classes"].items()
+        }
+        return model
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        state = {
+            "version": 1, # 状态格式的版本，格式变化时递增
+            "assignments": self.assignments,
+            "students": self.students,
+            "classes": {
+                name: {"作业": c["作业"], "sketches": [s.to_dict() for s in c["sketches"]]}
+                for name, c in self.classes.items()
+            },
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, path) # 先写临时文件再替换，中途被打断不会损坏已有状态
+
+    def update(self, assignment: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        函数功能：
+            纳入一份作业的分类结果：更新班级分布与学生标签计数，并给出每个学生的纵向预警
+
+        Args:
+            assignment (str): 作业名
+            df (pd.DataFrame): classify 的输出 (包含 学号/姓名/班级/耗时(分钟)/状态/分类标签)
+
+        Returns:
+            pd.DataFrame: 在 df 之后追加 '累计预警次数'、'纵向预警' 两列的新表
+        """
+        df = df.copy()
+        if df.empty:
+            return df
+
+        if assignment not in self.assignments:
+            self.assignments.append(assignment)
+
+        # 与 classify 计算基准时相同的有效数据口径：耗时在 (0, 720] 分钟内且已通关
+        minutes = df['耗时(分钟)']
+        valid = (minutes > 0) & (minutes <= 720) & df['状态'].str.contains('通关', na=False)
+
+        totals, escalations = [], []
+        for sid, name, class_name, label, x, is_valid in zip(df['学号'], df['姓名'], df['班级'], df['分类标签'], minutes, valid):
+            name = name if pd.notna(name) else None
+            class_name = class_name if pd.notna(class_name) else None
+            key = self._student_key(class_name, sid, name)
+            student = self.students.setdefault(key, {"姓名": name, "班级": class_name, "标签": {}, "计入": [], "吃力": 0, "秒刷": 0})
+            student["姓名"], student["班级"] = name, class_name # 以最新一次为准
+
+            # 同一份作业再次纳入时，先撤销旧标签的计数
+            self._count(student, student["标签"].get(assignment), -1)
+            student["标签"][assignment] = label
+            self._count(student, label, +1)
+
+            # 每个学生的每份作业只计入班级分布一次，重复纳入时只补入新出现的学生
+            if is_valid and class_name is not None and assignment not in student["计入"]:
+                self._add_to_class(class_name, assignment, float(x))
+                student["计入"].append(assignment)
+
+            totals.append(student["吃力"] + student["秒刷"])
+            escalations.append(self._escalation(student))
+
+        df['累计预警次数'] = totals
+        df['纵向预警'] = escalations
+        return df
+
+    @staticmethod
+    def _student_key(class_name, sid, name) -> str:
+        if pd.notna(sid) and str(sid) not in MISSING_IDS:
+            return str(sid)
+        return f"{class_name or ''}|{name or ''}"
+
+    def _add_to_class(self, class_name: str, assignment: str, x: float):
+        entry = self.classes.setdefault(class_name, {"作业": [], "sketches": [P2Quantile(p) for p in self.QUANTILES]})
+        if assignment not in entry["作业"]:
+            entry["作业"].append(assignment)
+        for sketch in entry["sketches"]:
+            sketch.add(x)
+
+    @staticmethod
+    def _count(student: dict, label, delta: int):
+        if label == STRUGGLE_LABEL:
+            student["吃力"] += delta
+        elif label == RUSH_LABEL:
+            student["秒刷"] += delta
+
+    def _escalation(self, student: dict) -> str:
+        if student["秒刷"] >= self.escalate_after:
+            return f"红色 (反复秒刷 {student['秒刷']} 次)"
+        if student["吃力"] >= self.escalate_after:
+            return f"黄色 (持续吃力 {student['吃力']} 次)"
+        if student["吃力"] + student["秒刷"] >= self.escalate_after:
+            return "黄色 (多次预警)"
+        return ""
+
+    def class_baselines(self) -> pd.DataFrame:
+        """
+        函数功能：
+            返回各班级整个学期的耗时分布估计 (Q1 / 中位数 / Q3)，供报表与看板使用
+        """
+        rows = []
+        for class_name, entry in self.classes.items():
+            q1, median, q3 = (s.value() for s in entry["sketches"])
+            rows.append({"班级": class_name, "作业数": len(entry["作业"]), "样本数": entry["sketches"][0].count,
+                         "Q1": round(q1, 2), "中位数": round(median, 2), "Q3": round(q3, 2)})
+        return pd.DataFrame(rows, columns=["班级", "作业数", "样本数", "Q1", "中位数", "Q3"])
@@ -7,99 +7,424 @@
     paddlepaddle 是轻量化的ocr 库，足以完成本项目的任务，github 链接：https://github.com/PaddlePaddle/PaddleOCR
     过程中直接把 pdf 文件转化为矩阵数据传给内存，而不存储在硬盘中，提高速度
     采用了正则表达式来准确提取出时间，不会受到干扰
+    模型采用懒加载：导入本模块不会加载模型，第一次真正需要 OCR 时才在当前进程中初始化并缓存，
+    这样纯文本型 pdf 的批次不会让每个工作进程都背上一份模型
+    EduCoder 报告版面固定，默认只识别模板中 "状态" 与 "耗时" 所在的区域 (ROI)，识别不全时再退回整页识别
+    已经渲染好的页面矩阵可以直接交给 ocr_process_images，避免同一份 pdf 被重复打开
+    可选多分辨率识别：先以较低的分辨率渲染识别，只有识别不全或置信度不足的文件才提高分辨率重新识别
 
 Dependencies:
     paddleocr：图像识别模型
-    pdfplumber：pdf 转换成 image
+    fitz (PyMuPDF)：pdf 转换成 image，比 pdfplumber.to_image 快得多
     re：正则表达式提取
     numpy:把 image 转化为矩阵
+    src.utils: 与文本解析共用的耗时正则
+    src.profiler: 可选的阶段计时 (渲染 / OCR识别)
 """
 import warnings
 # 强力屏蔽 ccache 相关的警告
 warnings.filterwarnings("ignore", message=".*ccache.*")
 import logging
 import re
-import pdfplumber
+import bisect
+import fitz # PyMuPDF
 import numpy as np
-from paddleocr import PaddleOCR
+from src.utils import DURATION_PATTERN
+from src.profiler import NULL_TIMER
 
 logging.getLogger("ppocr").setLevel(logging.ERROR)# 减少状态输出，防止刷屏，保持安静
 
-# 初始化模型的设定
-ocr_model = PaddleOCR(use_angle_cls=True, lang='ch', use_gpu=False, show_log=False)
+# 模型的设定 (每个进程最多初始化一次)
+OCR_MODEL_KWARGS = dict(use_angle_cls=True, lang='ch', use_gpu=False, show_log=False)
+_ocr_model = None
 
+# 渲染分辨率
+OCR_DPI = 150
 
-def ocr_process_pdf(pdf_path):
+# 多分辨率识别：低分辨率下状态或耗时缺失、或相关文本行的置信度低于该值的文件，提高分辨率重新识别
+OCR_MIN_CONFIDENCE = 0.85
+ESCALATED_SUFFIX = "-HD" # 提高分辨率重新识别过的文件，在 '识别方式' 后追加该后缀
+
+# 版面模板：各区域在页面中的相对坐标 (x0, top, x1, bottom)，取值 0~1，与渲染分辨率无关
+ROI_TEMPLATE = {
+    "状态": (0.0, 0.0, 1.0, 0.22),
+    "耗时": (0.0, 0.15, 1.0, 0.45),
+}
+
+
+def get_ocr_model():
+    """
+    函数功能：
+        获取当前进程的 OCR 模型句柄，第一次调用时才导入 paddleocr 并加载模型，之后直接复用
+
+    Returns:
+        PaddleOCR: 当前进程缓存的模型实例
+    """
+    global _ocr_model
+    if _ocr_model is None:
+        from paddleocr import PaddleOCR # 延迟导入，paddle 本身的导入也很重
+        _ocr_model = PaddleOCR(**OCR_MODEL_KWARGS)
+    return _ocr_model
+
+
+def init_ocr_worker():
+    """
+    函数功能：
+        进程池的 initializer 钩子。
+        专门负责 OCR 的工作进程可以在启动时预先加载模型，避免第一份扫描件承担加载耗时
+        initializer 抛出异常会导致整个进程池损坏，所以这里只打印错误，具体文件仍会按 "OCR失败" 记录
+    """
+    try:
+        get_ocr_model()
+    except Exception as e:
+        print(f"[OCR Error] 模型预加载失败: {e}")
+
+
+def recognize_images(images: list) -> list:
+    """
+    函数功能：
+        对多张图片做批量 OCR。
+        检测 (det) 只能逐张进行，但各张图片切出来的文本行会汇总到一起，
+        只调用一次方向分类 (cls) 和识别 (rec)，由 paddle 内部按 rec_batch_num 组批，摊薄每次调用的固定开销
+
+    Args:
+        images (list[np.ndarray]): 待识别的图片矩阵列表
+
+    Returns:
+        list[list[tuple]]: 与 images 一一对应，每张图片是 [(文本, 置信度), ...] 的列表
+    """
+    model = get_ocr_model()
+    try:
+        # paddleocr 在导入时会把自身目录加入 sys.path，这里复用它内部的切图与排序工具
+        from tools.infer.predict_system import sorted_boxes, get_rotate_crop_image
+    except ImportError:
+        # 版本差异导致拿不到内部工具时，退化为逐张调用
+        return [_lines_from_ocr_result(model.ocr(img, cls=True)) for img in images]
+
+    crops, owners = [], []
+    for idx, img in enumerate(images):
+        dt_boxes, _ = model.text_detector(img)
+        if dt_boxes is None:
+            continue
+        for box in sorted_boxes(dt_boxes):
+            crops.append(get_rotate_crop_image(img, box.copy()))
+            owners.append(idx)
+
+    lines = [[] for _ in images]
+    if not crops:
+        return lines
+
+    if model.use_angle_cls:
+        crops, _, _ = model.text_classifier(crops)
+    rec_res, _ = model.text_recognizer(crops)
+
+    for idx, (text, score) in zip(owners, rec_res):
+        if score >= model.drop_score:
+            lines[idx].append((text, score))
+    return lines
+
+
+def _lines_from_ocr_result(ocr_res) -> list:
+    """
+    函数功能：
+        把 model.ocr 的原始返回值整理为 [(文本, 置信度), ...]
+    """
+    if not ocr_res or not ocr_res[0]:
+        return []
+    return [(line[1][0], line[1][1]) for line in ocr_res[0]]
+
+
+def crop_regions(img_np, template: dict) -> list:
+    """
+    函数功能：
+        按模板的相对坐标把整页图片裁剪成若干小区域
+
+    Args:
+        img_np (np.ndarray): 整页图片矩阵
+        template (dict): {区域名: (x0, top, x1, bottom)}，相对坐标
+
+    Returns:
+        list[np.ndarray]: 各区域的图片矩阵 (空区域会被跳过)
+    """
+    height, width = img_np.shape[:2]
+    crops = []
+    for x0, top, x1, bottom in template.values():
+        crop = img_np[int(top * height):int(bottom * height), int(x0 * width):int(x1 * width)]
+        if crop.size:
+            crops.append(np.ascontiguousarray(crop))
+    return crops
+
+
+def _roi_incomplete(confidence) -> bool:
+    """
+    函数功能：
+        判断识别是否 "没拿到东西"：状态或耗时任一缺失，都需要退回整页识别
+        (以 _parse_ocr_lines 是否匹配到耗时为准，模板中明确写着的 "0" / "--" 也算拿到了)
+
+    Args:
+        confidence (float | None): _parse_ocr_lines 给出的置信度，None 表示状态或耗时缺失
+    """
+    return confidence is None
+
+
+def render_page(pdf_source, dpi: int = OCR_DPI, page_index: int = 0):
+    """
+    函数功能：
+        使用 PyMuPDF 将 pdf 的某一页渲染成 RGB 矩阵
+
+    Args:
+        pdf_source (str | bytes): pdf 文件路径，或已经读入内存的 pdf 字节
+        dpi (int): 渲染分辨率
+        page_index (int): 页码，默认第一页
+
+    Returns:
+        np.ndarray | None: 页面矩阵 (高, 宽, 3)，空 pdf 返回 None
+    """
+    if isinstance(pdf_source, (bytes, bytearray)):
+        doc = fitz.open(stream=pdf_source, filetype="pdf")
+    else:
+        doc = fitz.open(pdf_source)
+
+    with doc:
+        if doc.page_count <= page_index:
+            return None
+        pix = doc[page_index].get_pixmap(dpi=dpi, colorspace=fitz.csRGB, alpha=False)
+        # samples 每行可能带有对齐填充，按 stride 切出有效像素后再 reshape
+        buf = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.stride)
+        return buf[:, :pix.width * pix.n].reshape(pix.height, pix.width, pix.n).copy()
+
+
+def parse_ocr_lines(lines: list) -> dict:
+    """
+    函数功能：
+        从 OCR 识别出的文本行中提取学生完成作业的状态及耗时
+
+    Args:
+        lines (list[tuple]): [(文本, 置信度), ...]
+
+    Returns:
+        dict: 一个包含了状态和耗时的字典
+    """
+    return _parse_ocr_lines(lines)[0]
+
+
+def _parse_ocr_lines(lines: list) -> tuple:
+    """
+    函数功能：
+        parse_ocr_lines 的实现，同时给出识别置信度：状态关键字与耗时所在文本行的置信度中较低的一个
+
+    Returns:
+        tuple: (结果字典, 置信度)，没有提取到状态或耗时时置信度为 None
+    """
+    result = {"状态": "OCR失败", "耗时": "0", "识别方式": "OCR-AI"}
+    if not lines:
+        return result, None
+
+    all_texts = [text for text, _ in lines]
+    full_text = " ".join(all_texts)
+
+    # 提取状态 (同时记录关键字在全文中的位置，用于找到对应文本行的置信度)
+    status_pos = -1
+    if "按时通关" in full_text:
+        result["状态"] = "按时通关"
+        status_pos = full_text.find("按时通关")
+    elif "未通关" in full_text:
+        result["状态"] = "未通关"
+        status_pos = full_text.find("未通关")
+    elif "未开启" in full_text:
+        result["状态"] = "未开启"
+        status_pos = full_text.find("未开启")
+    elif "截止后" in full_text and "通关" in full_text:
+        result["状态"] = "截止后通关"
+        status_pos = full_text.find("截止后")
+    else:
+        if "通关" in full_text and "按时" in full_text:# 防止 ocr 模型误认为“按时 通关”
+            result["状态"] = "按时通关"
+            status_pos = full_text.find("通关")
+        else:
+            result["状态"] = "无法判定"
+
+    # 提取耗时时长
+        # 处理有时长的
+    matches = list(DURATION_PATTERN.finditer(full_text))
+
+    best_match = None
+    duration_pos = -1
+    for m in matches:
+        val = m.group(0).replace(" ", "")
+        # 优先处理秒和天，因为“分”在“分班”中也有
+        if "秒" in val or "天" in val:
+            best_match, duration_pos = val, m.start()
+            break
+        if not best_match: best_match, duration_pos = val, m.start()
+
+    if best_match:
+        result["耗时"] = best_match
+    else:
+            # 处理时长为 0 的
+        match_context = re.search(r"(页面停留时长|实训总耗时)\s*(\S+)", full_text)
+        if match_context:
+            val = match_context.group(2)
+            if val == "0" or val == "--":
+                result["耗时"] = val
+                duration_pos = match_context.start(2)
+
+    if status_pos < 0 or duration_pos < 0:
+        return result, None
+
+    # 按字符位置找到关键字与耗时所在的文本行 (全文由各行以单个空格拼接)
+    starts, offset = [], 0
+    for text in all_texts:
+        starts.append(offset)
+        offset += len(text) + 1
+    scores = [score for _, score in lines]
+    confidence = min(scores[bisect.bisect_right(starts, status_pos) - 1],
+                     scores[bisect.bisect_right(starts, duration_pos) - 1])
+    return result, float(confidence)
+
+
+def ocr_process_pdf(pdf_path, use_roi=True, roi_template=None):
     """
     函数功能：
         从 pdf 中提取学生完成作业的状态及耗时
 
     Args:
-        pdf_path (str): pdf 文件的绝对路径
+        pdf_path (str | bytes): pdf 文件的绝对路径，或已读入内存的 pdf 字节
+        use_roi (bool): 是否先只识别模板区域
+        roi_template (dict): 自定义区域模板，默认使用 ROI_TEMPLATE
 
     Returns:
         dict: 一个包含了状态和耗时的字典
             - '状态' (Status): 例如'按时通关', '未通关'
             - '耗时' (Duration): 例如：'3天6时', '0'
     """
-    # 默认返回值
-    result = {"状态": "OCR失败", "耗时": "0", "识别方式": "OCR-AI"}
+    return ocr_process_batch([pdf_path], use_roi=use_roi, roi_template=roi_template)[0]
+
+
+def ocr_process_batch(pdf_paths: list, use_roi=True, roi_template=None, dpi=OCR_DPI, roi_only=False,
+                      escalate_dpi=None, min_confidence=OCR_MIN_CONFIDENCE, timer=NULL_TIMER) -> list:
+    """
+    函数功能：
+        批量版本的 ocr_process_pdf：先把多份扫描件逐一渲染成图片，再合并成一批送入模型
+        指定 escalate_dpi 时按多分辨率识别：先以 dpi 渲染识别，状态或耗时缺失、或置信度不足的文件
+        再以 escalate_dpi 重新渲染识别 (大多数清晰的截图在低分辨率下即可识别，只有少数文件需要付出高分辨率的代价)
+
+    Args:
+        pdf_paths (list[str | bytes]): pdf 文件路径或 pdf 字节的列表
+        use_roi (bool): 是否先只识别模板区域
+        roi_template (dict): 自定义区域模板，默认使用 ROI_TEMPLATE
+        dpi (int): 渲染分辨率
+        roi_only (bool): 只做区域识别，不退回整页 (超时重试等需要限制耗时的场景)
+        escalate_dpi (int): 识别不可靠时重新渲染的分辨率，None 表示不提高分辨率
+        min_confidence (float): 接受低分辨率结果所需的最低置信度
+        timer (StageTimer): 可选的阶段计时器，记录整批的 "渲染" 与 "OCR识别" 耗时
+
+    Returns:
+        list[dict]: 与 pdf_paths 一一对应的结果字典，格式与 ocr_process_pdf 相同
+    """
+    images = _render_pages(pdf_paths, dpi, timer)
+    with timer.stage("OCR识别"):
+        results, confidences = _ocr_images(images, use_roi=use_roi, roi_template=roi_template, roi_only=roi_only)
+
+    if not escalate_dpi or escalate_dpi <= dpi or confidences is None:
+        return results # 未开启多分辨率，或模型本身出错 (提高分辨率也无济于事)
+
+    # 低分辨率下识别不全或置信度不足的文件，提高分辨率重新识别 (渲染失败的文件重新渲染也无济于事)
+    retry = [idx for idx, (img_np, confidence) in enumerate(zip(images, confidences))
+             if img_np is not None and (_roi_incomplete(confidence) or confidence < min_confidence)]
+    images = None # 低分辨率的图片不再需要，先释放再渲染高分辨率的图片
+    if not retry:
+        return results
+
+    hd_images = _render_pages([pdf_paths[idx] for idx in retry], escalate_dpi, timer)
+    with timer.stage("OCR识别"):
+        hd_results, hd_confidences = _ocr_images(hd_images, use_roi=use_roi, roi_template=roi_template, roi_only=roi_only)
+    hd_confidences = hd_confidences or [None] * len(hd_results)
+    for idx, hd_result, hd_confidence in zip(retry, hd_results, hd_confidences):
+        # 高分辨率反而识别不全时 (例如渲染失败)，保留低分辨率的结果
+        if not (_roi_incomplete(hd_confidence) and not _roi_incomplete(confidences[idx])):
+            results[idx] = hd_result
+        results[idx]["识别方式"] += ESCALATED_SUFFIX
+    return results
+
+
+def _render_pages(pdf_paths: list, dpi: int, timer=NULL_TIMER) -> list:
+    # 逐个渲染，单个文件损坏不影响同批的其他文件 (渲染失败记为 None)
+    images = []
+    for pdf_path in pdf_paths:
+        try:
+            with timer.stage("渲染"):
+                images.append(render_page(pdf_path, dpi=dpi))
+        except Exception as e:
+            print(f"[OCR Error] {e}")
+            images.append(None)
+    return images
+
+
+def ocr_process_images(images: list, use_roi=True, roi_template=None, roi_only=False) -> list:
+    """
+    函数功能：
+        对已经渲染好的页面矩阵做批量识别，调用方已经打开过 pdf 时直接走这里，不再重复解析文件
+        开启 ROI 时，第一轮只识别模板区域；识别不全的文件再汇总成第二批做整页识别
+
+    Args:
+        images (list[np.ndarray | None]): 页面矩阵列表，None 表示该文件渲染失败
+        use_roi (bool): 是否先只识别模板区域
+        roi_template (dict): 自定义区域模板，默认使用 ROI_TEMPLATE
+        roi_only (bool): 只做区域识别，识别不全的文件也不再做整页识别
+
+    Returns:
+        list[dict]: 与 images 一一对应的结果字典
+    """
+    return _ocr_images(images, use_roi=use_roi, roi_template=roi_template, roi_only=roi_only)[0]
+
+
+def _ocr_images(images: list, use_roi=True, roi_template=None, roi_only=False) -> tuple:
+    """
+    函数功能：
+        ocr_process_images 的实现，同时给出每个结果的置信度 (见 _parse_ocr_lines)
+
+    Returns:
+        tuple: (结果字典列表, 置信度列表)；识别过程本身出错 (例如模型加载失败) 时置信度列表为 None
+    """
+    results = [{"状态": "OCR失败", "耗时": "0", "识别方式": "OCR-AI"} for _ in images]
+    confidences = [None] * len(images)
+    slots = [idx for idx, img_np in enumerate(images) if img_np is not None]
+    images = [images[idx] for idx in slots]
+
+    if not images:
+        return results, confidences
 
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            if not pdf.pages:
-                return result
-            page = pdf.pages[0]
-            # 将 pdf 文件转化为 image，再把 image 转化为矩阵传给内存
-            img = page.to_image(resolution=150).original
-            img_np = np.array(img)
-
-            ocr_res = ocr_model.ocr(img_np, cls=True)
-
-            if ocr_res and ocr_res[0]:
-                all_texts = [line[1][0] for line in ocr_res[0]]
-                full_text = " ".join(all_texts)
-
-                # 提取状态
-                if "按时通关" in full_text:
-                    result["状态"] = "按时通关"
-                elif "未通关" in full_text:
-                    result["状态"] = "未通关"
-                elif "未开启" in full_text:
-                    result["状态"] = "未开启"
-                elif "截止后" in full_text and "通关" in full_text:
-                    result["状态"] = "截止后通关"
-                else:
-                    if "通关" in full_text and "按时" in full_text:# 防止 ocr 模型误认为“按时 通关”
-                        result["状态"] = "按时通关"
-                    else:
-                        result["状态"] = "无法判定"
-
-                # 提取耗时时长
-                    # 处理有时长的
-                pattern_standard = r'((\d+)\s*(天|时|分(?!班)|秒)\s*)+'# 防止匹配到“分班”的分
-                matches = list(re.finditer(pattern_standard, full_text))
-
-                best_match = None
-                for m in matches:
-                    val = m.group(0).replace(" ", "")
-                    # 优先处理秒和天，因为“分”在“分班”中也有
-                    if "秒" in val or "天" in val:
-                        best_match = val
-                        break
-                    if not best_match: best_match = val
-
-                if best_match:
-                    result["耗时"] = best_match
-                else:
-                        # 处理时长为 0 的
-                    match_context = re.search(r"(页面停留时长|实训总耗时)\s*(\S+)", full_text)
-                    if match_context:
-                        val = match_context.group(2)
-                        if val == "0" or val == "--":
-                            result["耗时"] = val
+        if use_roi:
+            template = roi_template or ROI_TEMPLATE
+            crops, owners = [], []
+            for idx, img_np in zip(slots, images):
+                for crop in crop_regions(img_np, template):
+                    crops.append(crop)
+                    owners.append(idx)
+
+            roi_lines = {idx: [] for idx in slots}
+            for idx, lines in zip(owners, recognize_images(crops)):
+                roi_lines[idx].extend(lines)
+
+            fallback_slots, fallback_images = [], []
+            for idx, img_np in zip(slots, images):
+                roi_result, confidences[idx] = _parse_ocr_lines(roi_lines[idx])
+                roi_result["识别方式"] = "OCR-ROI"
+                results[idx] = roi_result
+                if _roi_incomplete(confidences[idx]) and not roi_only:
+                    fallback_slots.append(idx)
+                    fallback_images.append(img_np)
+            slots, images = fallback_slots, fallback_images
+
+        # 未开启 ROI 或 ROI 识别不全的文件，做整页识别
+        if images:
+            for idx, lines in zip(slots, recognize_images(images)):
+                results[idx], confidences[idx] = _parse_ocr_lines(lines)
 
     except Exception as e:
         print(f"[OCR Error] {e}")
+        return results, None
 
-    return result
\ No newline at end of file
+    return results, confidences
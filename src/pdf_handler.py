@@ -8,22 +8,144 @@
     同时把它叫做 handler 而不是 processor 是因为它会像人一样根据特定的策略来处理 pdf
     并且会根据用户电脑的核心类型，进行多进程的分配任务，来加快识别速度
 
+    提取耗时采用由快到慢的三级策略：整页文本正则 -> 单词坐标定位 -> 表格提取 (extract_tables 最昂贵，只作兜底)
+    每份 pdf 只从磁盘读取一次：pdfplumber 直接解析内存中的字节，
+    若判定为图片型，则用同一份字节渲染出页面矩阵交给 ocr_engine，不再由 OCR 重新打开文件
+
 依赖关系：
     - pdfplumer：用于阅读文本型 pdf
     - src.ocr_engine: 用于解析扫描件/图片型 PDF
+    - src.raw_file_processor: 免解压模式下从压缩包读取 pdf 字节
+    - src.profiler: 可选的阶段耗时剖析
 """
 
+import io
 import pdfplumber
-from src.ocr_engine import ocr_process_pdf
+from src.ocr_engine import ocr_process_batch, ocr_process_images, render_page
+from src.utils import DURATION_PATTERN
+from src.raw_file_processor import read_zip_member
+from src.profiler import NULL_TIMER, StageTimer, make_timer, attach_timings
+
+DURATION_LABEL = "实训总耗时"
+
+# 解析器版本：解析逻辑 (包括 OCR 部分) 的输出发生变化时必须提升，结果缓存以它作为键的一部分
+PARSER_VERSION = "3"
+# parse_pdf_report 产出的字段，其余字段都来自 raw_file_processor 的基础信息
+RESULT_FIELDS = ("状态", "耗时", "识别方式", "异常备注")
+
+# 分诊标记：文本提取阶段发现是图片型 pdf，但本进程不负责 OCR，交给专门的 OCR 进程池处理
+NEEDS_OCR = "待OCR"
+# 调度器在任务超时后终止工作进程，此类文件记为该状态 (与解析得到的状态区分)
+TIMEOUT_STATUS = "解析超时"
+
+
+def _duration_from_text(text: str) -> str:
+    """
+    函数功能：
+        快速路径一：在整页文本中寻找 "实训总耗时" 所在行，用正则直接截取紧随其后的时长
+
+    Returns:
+        str | None: 时长字符串，找不到时返回 None
+    """
+    for line in text.split('\n'):
+        pos = line.find(DURATION_LABEL)
+        if pos < 0:
+            continue
+        rest = line[pos + len(DURATION_LABEL):].lstrip(' :：')
+        match = DURATION_PATTERN.match(rest)
+        if match:
+            end = match.end()
+            if end < len(rest) and not rest[end - 1].isspace():
+                return None # 只匹配到时长的一部分 (出现未知的单位等)，交给后续路径整格提取
+            return match.group(0).replace(" ", "")
+    return None
+
+
+def _duration_from_words(page) -> str:
+    """
+    函数功能：
+        快速路径二：根据单词坐标定位。先找同一行右侧的单词，再找正下方同一列的单词
+        (表格型版面中表头与数值往往不在同一行，extract_text 的行序会把它们拆开)
+
+    Args:
+        page (pdfplumber.page.Page): pdf 页面对象
+
+    Returns:
+        str | None: 时长字符串，找不到时返回 None
+    """
+    words = page.extract_words()
+    for label in words:
+        if DURATION_LABEL not in label["text"]:
+            continue
+
+        right, below = [], []
+        for word in words:
+            if word is label or "实训" in word["text"] or not DURATION_PATTERN.search(word["text"]):
+                continue
+            same_line = abs(word["top"] - label["top"]) < 3 and word["x0"] >= label["x1"]
+            same_column = word["top"] > label["bottom"] and word["x0"] < label["x1"] and word["x1"] > label["x0"]
+            if same_line:
+                right.append(word)
+            elif same_column:
+                below.append(word)
+
+        if right:
+            return min(right, key=lambda w: w["x0"])["text"]
+        if below:
+            return min(below, key=lambda w: w["top"])["text"]
+    return None
+
+
+def _duration_from_tables(page) -> str:
+    """
+    函数功能：
+        兜底路径：表格提取，逐行寻找 "实训总耗时" 所在的行
+
+    Returns:
+        str | None: 时长字符串，找不到时返回 None
+    """
+    tables = page.extract_tables()
+    if tables:
+        for table in tables:
+            for row in table:
+                row_str = str(row)
+                if DURATION_LABEL in row_str:
+                    for cell in row:
+                        if cell and ("天" in cell or "时" in cell or "分" in cell) and "实训" not in cell:
+                            return cell
+    return None
+
+
+def load_pdf_bytes(file_info: dict) -> bytes:
+    """
+    函数功能：
+        读取一份作业的 pdf 字节：免解压模式从压缩包成员读取，否则从磁盘读取
+
+    Args:
+        file_info (dict): 学生基础信息字典
+
+    Returns:
+        bytes: pdf 文件内容
+    """
+    if file_info.get("压缩包"):
+        return read_zip_member(file_info["压缩包"], file_info["压缩包成员"])
+    with open(file_info["文件路径"], 'rb') as f:
+        return f.read()
 
 
-def parse_pdf_report(pdf_path: str) -> dict:
+def parse_pdf_report(pdf_path: str, allow_ocr: bool = True, fast_text: bool = True, pdf_bytes: bytes = None,
+                     timer=NULL_TIMER) -> dict:
     """
     函数功能：
         阅读 pdf 文件，提取其中的文本数据
 
     Args：
         pdf_path (str): pdf 文件的路径
+        allow_ocr (bool): 是否允许在本进程内直接调用 OCR。为 False 时，图片型 pdf 只打上 NEEDS_OCR 标记后返回
+        fast_text (bool): 是否先走文本/单词坐标的快速路径，失败才做表格提取。
+                          实际采用的路径记录在 '识别方式' 中：TEXT-FAST / TEXT-WORDS / TEXT-TABLE
+        pdf_bytes (bytes): 已读入内存的 pdf 内容，提供时不再读取 pdf_path
+        timer (StageTimer): 可选的阶段计时器 (见 src.profiler)，默认不计时
 
     Returns：
         dict: 包含了状态和持续时间的dict
@@ -37,18 +159,39 @@ def parse_pdf_report(pdf_path: str) -> dict:
     }
 
     try:
+        raw = pdf_bytes
+        if raw is None:
+            with timer.stage("读取"), open(pdf_path, 'rb') as f:
+                raw = f.read()
+
         # 尝试使用 pdfplumer 进行快速处理
-        with pdfplumber.open(pdf_path) as pdf:
+        with timer.stage("打开"):
+            pdf = pdfplumber.open(io.BytesIO(raw))
+            timer.meta["页数"] = len(pdf.pages)
+        with pdf:
             if not pdf.pages:
                 data["异常备注"] = "Empty PDF"
                 return data
 
             first_page = pdf.pages[0]
-            text = first_page.extract_text()
+            with timer.stage("文本提取"):
+                text = first_page.extract_text()
 
             # 如果 text 长度小于 5，那就是一张图片，需要调用 ocr
             if not text or len(text.strip()) < 5:
-                return ocr_process_pdf(pdf_path)
+                if not allow_ocr:
+                    data["状态"] = NEEDS_OCR
+                    data["识别方式"] = "OCR-AI"
+                    return data
+                # 复用已读入内存的字节直接渲染，不再让 OCR 模块重新打开文件
+                try:
+                    with timer.stage("渲染"):
+                        img_np = render_page(raw)
+                except Exception as e:
+                    print(f"[OCR Error] {e}")
+                    img_np = None # 渲染失败按 "OCR失败" 记录，与 OCR 模块内部的容错保持一致
+                with timer.stage("OCR识别"):
+                    return ocr_process_images([img_np])[0]
 
             # 如果是文本型的 pdf
                 # 提取状态
@@ -68,16 +211,20 @@ def parse_pdf_report(pdf_path: str) -> dict:
                     break
 
                 # 提取耗时时长
-            tables = first_page.extract_tables()
-            if tables:
-                for table in tables:
-                    for row in table:
-                        row_str = str(row)
-                        if "实训总耗时" in row_str:
-                            for cell in row:
-                                if cell and ("天" in cell or "时" in cell or "分" in cell) and "实训" not in cell:
-                                    data["耗时"] = cell
-                                    break
+            duration = None
+            if fast_text:
+                duration = _duration_from_text(text)
+                data["识别方式"] = "TEXT-FAST"
+                if not duration:
+                    with timer.stage("单词定位"):
+                        duration = _duration_from_words(first_page)
+                    data["识别方式"] = "TEXT-WORDS"
+            if not duration:
+                with timer.stage("表格提取"):
+                    duration = _duration_from_tables(first_page)
+                data["识别方式"] = "TEXT-TABLE"
+            if duration:
+                data["耗时"] = duration
 
     except Exception as e:
         data["异常备注"] = str(e)
@@ -86,7 +233,7 @@ def parse_pdf_report(pdf_path: str) -> dict:
     return data
 
 
-def enrich_data(file_info: dict) -> dict:
+def enrich_data(file_info: dict, allow_ocr: bool = True, profile: bool = False) -> dict:
     """
     函数功能：
         多进程的执行单元（Wrapper）。
@@ -94,15 +241,21 @@ def enrich_data(file_info: dict) -> dict:
 
     Args:
         file_info (dict): raw_file_processor中得到的包含 '文件路径'、'姓名' 等基础信息的字典。
+        allow_ocr (bool): 透传给 parse_pdf_report，分诊进程池中为 False
+        profile (bool): 是否记录阶段耗时、页数与文件大小 (见 src.profiler)
 
     Returns:
         dict: 更新了 '状态' 和 '耗时' 的字典。将学生基本信息和学生做题情况结合到一起
     """
+    timer = make_timer(profile)
     try:
         pdf_path = file_info["文件路径"]
+        with timer.stage("读取"):
+            raw = load_pdf_bytes(file_info)
+        timer.meta["文件大小"] = len(raw)
 
         # 调用本模块内部的核心解析逻辑
-        result_data = parse_pdf_report(pdf_path)
+        result_data = parse_pdf_report(pdf_path, allow_ocr=allow_ocr, pdf_bytes=raw, timer=timer)
 
         # 将解析结果合并回原始信息
         file_info.update(result_data)
@@ -111,4 +264,67 @@ def enrich_data(file_info: dict) -> dict:
     except Exception as e:
         # 进程级容错：确保单个文件的失败不会导致整个进程池崩溃
         file_info.update({"状态": "系统错误", "异常备注": str(e)})
-        return file_info
\ No newline at end of file
+        return file_info
+
+    finally:
+        attach_timings(file_info, timer)
+
+
+def enrich_batch(file_infos: list, allow_ocr: bool = True, profile: bool = False) -> list:
+    """
+    函数功能：
+        分块版本的 enrich_data：一次进程间往返处理多份小文件，减少调度与序列化开销。
+
+    Args:
+        file_infos (list[dict]): 学生基础信息字典列表
+        allow_ocr (bool): 透传给 enrich_data
+        profile (bool): 透传给 enrich_data
+
+    Returns:
+        list[dict]: 与 file_infos 一一对应的结果字典
+    """
+    return [enrich_data(info, allow_ocr=allow_ocr, profile=profile) for info in file_infos]
+
+
+def ocr_enrich_batch(file_infos: list, ocr_options: dict = None, profile: bool = False) -> list:
+    """
+    函数功能：
+        OCR 进程池的执行单元，只处理分诊阶段标记为 NEEDS_OCR 的文件。
+        一次把多份扫描件送入模型，摊薄每次推理的固定开销。
+
+    Args:
+        file_infos (list[dict]): 分诊阶段返回的字典列表
+        ocr_options (dict): 透传给 ocr_process_batch 的参数，例如 {'use_roi': True}
+        profile (bool): 是否记录阶段耗时 (批内每个文件分摊整批的渲染与识别耗时)
+
+    Returns:
+        list[dict]: 与 file_infos 一一对应、已合并 OCR 结果的字典列表
+    """
+    try:
+        # 单个文件读取失败只影响它自己，其余文件照常组批识别
+        loaded, sources = [], []
+        for info in file_infos:
+            timer = make_timer(profile)
+            try:
+                with timer.stage("读取"):
+                    sources.append(load_pdf_bytes(info))
+                loaded.append(info)
+            except Exception as e:
+                info.update({"状态": "系统错误", "异常备注": str(e)})
+            attach_timings(info, timer)
+
+        batch_timer = make_timer(profile)
+        ocr_results = ocr_process_batch(sources, timer=batch_timer, **(ocr_options or {}))
+        for info, ocr_result in zip(loaded, ocr_results):
+            info.update(ocr_result)
+            if profile:
+                share = StageTimer()
+                for name, seconds in batch_timer.stages.items():
+                    share.add(name, seconds / len(loaded))
+                attach_timings(info, share)
+
+    except Exception as e:
+        for info in file_infos:
+            info.update({"状态": "系统错误", "异常备注": str(e)})
+
+    return file_infos
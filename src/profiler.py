@@ -0,0 +1,162 @@
+# src/profiler.py
+"""
+模块功能：
+    逐文件、逐阶段的耗时剖析。开启后，每份结果会带上 '阶段耗时' (读取、打开、文本提取、表格提取、渲染、OCR识别 等)、
+    '页数' 与 '文件大小'，运行结束时汇总成热点报告：最慢的文件、各阶段的耗时占比、OCR 回退率。
+
+说明：
+    关闭时使用 NULL_TIMER：stage() 直接返回一个共享的空上下文，不计时也不分配对象，开销可以忽略
+    OCR 是整批推理的，批内每个文件分摊该批的渲染与识别耗时
+
+依赖关系：
+    time: 高精度计时
+    heapq: 维护最慢的若干个文件
+"""
+import time
+import heapq
+from contextlib import contextmanager, nullcontext
+
+_NULL_CONTEXT = nullcontext()
+
+
+class StageTimer:
+    """
+    记录一份文件各阶段的耗时 (秒)：
+
+        timer = StageTimer()
+        with timer.stage("文本提取"):
+            text = page.extract_text()
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.meta = {} # 页数等附加信息
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+
+class _DiscardDict(dict):
+    # 丢弃一切写入的空字典：NULL_TIMER 在所有任务间共享，不能真的保存附加信息
+    def __setitem__(self, key, value):
+        pass
+
+    def update(self, *args, **kwargs):
+        pass
+
+    def setdefault(self, key, default=None):
+        return default
+
+
+class _NullTimer:
+    # 关闭剖析时的替身，接口与 StageTimer 一致
+    stages = None
+    meta = _DiscardDict()
+
+    def stage(self, name: str):
+        return _NULL_CONTEXT
+
+    def add(self, name: str, seconds: float):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+def make_timer(enabled: bool):
+    """
+    函数功能：
+        开启剖析时返回新的 StageTimer，否则返回共享的 NULL_TIMER
+    """
+    return StageTimer() if enabled else NULL_TIMER
+
+
+def attach_timings(file_info: dict, timer):
+    """
+    函数功能：
+        把计时结果合并进结果字典 (OCR 阶段会在分诊阶段的计时上继续累加)
+
+    Args:
+        file_info (dict): 结果字典
+        timer (StageTimer | _NullTimer): 计时器，关闭剖析时什么都不做
+    """
+    if timer.stages is None:
+        return
+    stages = file_info.setdefault("阶段耗时", {})
+    for name, seconds in timer.stages.items():
+        stages[name] = round(stages.get(name, 0.0) + seconds, 6)
+    file_info.update(timer.meta)
+
+
+class HotPathReport:
+    """
+    汇总全部结果的阶段耗时，生成热点报告
+    """
+
+    def __init__(self, top_n: int = 10):
+        self.top_n = top_n
+        self.totals = {} # 阶段 -> 累计秒数
+        self.files = 0 # 带有计时信息的文件数
+        self.untimed = 0 # 缓存/续跑命中等没有计时信息的文件数
+        self.ocr_files = 0
+        self._slowest = [] # 小根堆：(总耗时, 序号, 文件信息)
+
+    def add(self, res: dict):
+        stages = res.get("阶段耗时")
+        if not stages:
+            self.untimed += 1
+            return
+
+        self.files += 1
+        total = 0.0
+        for name, seconds in stages.items():
+            self.totals[name] = self.totals.get(name, 0.0) + seconds
+            total += seconds
+        if str(res.get("识别方式", "")).startswith("OCR"):
+            self.ocr_files += 1
+
+        entry = (total, self.files, {"文件路径": res.get("文件路径"), "姓名": res.get("姓名"), "总耗时": round(total, 4),
+                                     "页数": res.get("页数"), "文件大小": res.get("文件大小"),
+                                     "识别方式": res.get("识别方式"), "阶段耗时": stages})
+        if len(self._slowest) < self.top_n:
+            heapq.heappush(self._slowest, entry)
+        else:
+            heapq.heappushpop(self._slowest, entry)
+
+    def to_dict(self) -> dict:
+        grand_total = sum(self.totals.values())
+        return {
+            "files": self.files,
+            "untimed_files": self.untimed,
+            "ocr_fallback_rate": self.ocr_files / self.files if self.files else 0.0,
+            "stage_seconds": {k: round(v, 4) for k, v in sorted(self.totals.items(), key=lambda kv: -kv[1])},
+            "stage_share": {k: round(v / grand_total, 4) if grand_total else 0.0
+                            for k, v in sorted(self.totals.items(), key=lambda kv: -kv[1])},
+            "slowest_files": [e[2] for e in sorted(self._slowest, reverse=True)],
+        }
+
+    def format(self) -> str:
+        """
+        函数功能：
+            生成控制台打印用的热点报告文本
+        """
+        report = self.to_dict()
+        lines = [f"[性能剖析] 计时文件数: {report['files']} | 无计时 (缓存/续跑命中): {report['untimed_files']} | "
+                 f"OCR 回退率: {report['ocr_fallback_rate']:.1%}"]
+        for name, seconds in report["stage_seconds"].items():
+            lines.append(f"    {name:<8} {seconds:>9.2f}s  {report['stage_share'][name]:>6.1%}")
+        if report["slowest_files"]:
+            lines.append(f"[性能剖析] 最慢的 {len(report['slowest_files'])} 份文件：")
+            for item in report["slowest_files"]:
+                hottest = max(item["阶段耗时"], key=item["阶段耗时"].get)
+                lines.append(f"    {item['总耗时']:>8.3f}s  {item['姓名']}  页数: {item['页数']}  "
+                             f"大小: {(item['文件大小'] or 0) / 1024:.0f}KB  最耗时阶段: {hottest}  ({item['识别方式']})")
+        return "\n".join(lines)
@@ -0,0 +1,230 @@
+# src/progress.py
+"""
+模块功能：
+    运行进度与实时指标。主进程每拿到一个结果只做计数，由后台线程按固定频率统一输出：
+    1. 控制台 (TTY) 上的单行进度条：完成数、吞吐量、预计剩余时间、队列深度、OCR 与错误计数
+    2. Prometheus 文本格式的指标文件 (可交给 node_exporter 的 textfile collector 采集，也可以直接 cat 查看)
+    3. stdout 不是终端时 (例如定时任务)，不刷进度条，改为定期向日志文件追加一行 JSON
+
+说明：
+    输出频率与结果数量无关，长批次不会因为逐条刷新控制台而被拖慢
+    指标文件先写临时文件再替换，采集方不会读到写了一半的内容
+    吞吐量按最近一段时间窗口计算，ETA 随速度变化及时调整
+
+依赖关系：
+    threading: 后台刷新线程
+    json: 结构化日志
+    src.cache: 偶发故障状态的定义 (计入错误数)
+"""
+import os
+import sys
+import json
+import time
+import threading
+from collections import deque
+
+from src.cache import TRANSIENT_STATUSES
+
+
+class ProgressReporter:
+    """
+    节流的进度与指标输出器，以上下文管理器的方式使用：
+
+        with ProgressReporter(total, metrics_file=path, depth=scheduler.get_queue_depth) as progress:
+            scheduler.run(files_list, on_result=progress.update)
+    """
+
+    def __init__(self, total: int, refresh_interval: float = 0.5, metrics_file: str = None,
+                 metrics_interval: float = 5.0, log_file: str = None, log_interval: float = 10.0,
+                 depth=None, stream=None, rate_window: float = 30.0):
+        """
+        Args:
+            total (int): 任务总数
+            refresh_interval (float): 控制台刷新间隔 (秒)
+            metrics_file (str): Prometheus 文本格式的指标文件，None 表示不写出
+            metrics_interval (float): 指标文件的刷新间隔 (秒)
+            log_file (str): stdout 不是终端时的 JSON 进度日志，None 表示不写出
+            log_interval (float): 进度日志的记录间隔 (秒)
+            depth (callable): 返回当前队列深度 {阶段: 数量} 的函数 (例如调度器的 get_queue_depth)
+            stream: 控制台输出流，默认 sys.stdout
+            rate_window (float): 计算吞吐量的时间窗口 (秒)
+        """
+        self.total = total
+        self.refresh_interval = refresh_interval
+        self.metrics_file = metrics_file
+        self.metrics_interval = metrics_interval
+        self.log_file = log_file
+        self.log_interval = log_interval
+        self.depth = depth
+        self.stream = stream or sys.stdout
+        self.rate_window = rate_window
+        self.interactive = hasattr(self.stream, "isatty") and self.stream.isatty()
+
+        # 计数只在主线程中累加，后台线程只读
+        self.finished = 0
+        self.ocr_count = 0
+        self.errors = {} # 状态 -> 数量
+        self.current = ""
+
+        self._start = None
+        self._samples = deque() # (时间, 完成数)，用于计算窗口吞吐量
+        self._stop = threading.Event()
+        self._thread = None
+        self._log = None
+
+    def __enter__(self):
+        self._start = time.time()
+        self._samples.append((self._start, 0))
+        if self.log_file and not self.interactive:
+            os.makedirs(os.path.dirname(self.log_file) or ".", exist_ok=True)
+            self._log = open(self.log_file, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._loop, name="progress-reporter", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join()
+        # 收尾时无条件输出一次最终状态
+        snapshot = self.snapshot()
+        if self.interactive:
+            self._render(snapshot)
+        if self._log is not None:
+            self._write_log(snapshot, final=True)
+            self._log.close()
+            self._log = None
+        if self.metrics_file:
+            self._write_metrics(snapshot)
+        return False
+
+    def update(self, res: dict):
+        """
+        函数功能：
+            记录一个完成的结果 (只做计数，不产生任何 I/O)，可直接作为调度器的 on_result 回调
+
+        Args:
+            res (dict): enrich_data / ocr_enrich_batch 输出的结果字典
+        """
+        self.finished += 1
+        if str(res.get("识别方式", "")).startswith("OCR"):
+            self.ocr_count += 1
+        status = res.get("状态")
+        if status in TRANSIENT_STATUSES:
+            self.errors[status] = self.errors.get(status, 0) + 1
+        self.current = res.get("姓名", "Unknown")
+
+    def snapshot(self) -> dict:
+        """
+        函数功能：
+            汇总当前的进度与指标
+
+        Returns:
+            dict: 完成数、总数、已用时间、吞吐量 (个/秒)、预计剩余时间、队列深度、OCR 与错误计数
+        """
+        now = time.time()
+        finished = self.finished
+        samples = self._samples
+        samples.append((now, finished))
+        while len(samples) > 2 and now - samples[1][0] >= self.rate_window:
+            samples.popleft()
+
+        span = now - samples[0][0]
+        rate = (finished - samples[0][1]) / span if span > 0 else 0.0
+        remaining = max(0, self.total - finished)
+        eta = remaining / rate if rate > 0 else None
+        return {
+            "time": round(now, 3),
+            "finished": finished,
+            "total": self.total,
+            "elapsed": round(now - self._start, 3),
+            "rate": round(rate, 3),
+            "eta": round(eta, 1) if eta is not None else None,
+            "queue_depth": dict(self.depth()) if self.depth else {},
+            "ocr": self.ocr_count,
+            "errors": dict(self.errors),
+        }
+
+    def _loop(self):
+        # 后台线程：控制台按 refresh_interval 刷新，指标文件与日志按各自的间隔写出
+        next_metrics = next_log = 0.0
+        while not self._stop.wait(self.refresh_interval):
+            snapshot = self.snapshot()
+            now = snapshot["time"]
+            try:
+                if self.interactive:
+                    self._render(snapshot)
+                if self._log is not None and now >= next_log:
+                    self._write_log(snapshot)
+                    next_log = now + self.log_interval
+                if self.metrics_file and now >= next_metrics:
+                    self._write_metrics(snapshot)
+                    next_metrics = now + self.metrics_interval
+            except OSError as e:
+                print(f"[Warn] 进度输出失败: {e}")
+
+    def _render(self, snapshot: dict, bar_length: int = 30):
+        total = snapshot["total"]
+        ratio = snapshot["finished"] / total if total else 1.0
+        filled = int(bar_length * min(ratio, 1.0))
+        bar = '#' * filled + '-' * (bar_length - filled)
+        eta = _format_seconds(snapshot["eta"]) if snapshot["eta"] is not None else "--"
+        depth = "/".join(str(n) for n in snapshot["queue_depth"].values()) or "-"
+        errors = sum(snapshot["errors"].values())
+
+        current = self.current
+        if len(current) > 12:
+            current = current[:9] + "..."
+        # 使用 \r 回车符实现单行刷新
+        self.stream.write(f"\r[{bar}] {ratio:6.1%} {snapshot['finished']}/{total} | {snapshot['rate']:.1f}/s | "
+                          f"ETA {eta} | 队列 {depth} | OCR {snapshot['ocr']} | 错误 {errors} | {current:<12}")
+        self.stream.flush()
+
+    def _write_log(self, snapshot: dict, final: bool = False):
+        record = dict(snapshot, event="finished" if final else "progress")
+        self._log.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._log.flush()
+
+    def _write_metrics(self, snapshot: dict):
+        os.makedirs(os.path.dirname(self.metrics_file) or ".", exist_ok=True)
+        lines = [
+            "# HELP educoder_files_total Number of files in the current run.",
+            "# TYPE educoder_files_total gauge",
+            f"educoder_files_total {snapshot['total']}",
+            "# HELP educoder_files_finished_total Number of files finished so far.",
+            "# TYPE educoder_files_finished_total counter",
+            f"educoder_files_finished_total {snapshot['finished']}",
+            "# HELP educoder_throughput_files_per_second Files finished per second over the recent window.",
+            "# TYPE educoder_throughput_files_per_second gauge",
+            f"educoder_throughput_files_per_second {snapshot['rate']}",
+            "# HELP educoder_eta_seconds Estimated seconds until the run finishes (-1 if unknown).",
+            "# TYPE educoder_eta_seconds gauge",
+            f"educoder_eta_seconds {snapshot['eta'] if snapshot['eta'] is not None else -1}",
+            "# HELP educoder_queue_depth Tasks waiting or running per stage.",
+            "# TYPE educoder_queue_depth gauge",
+        ]
+        lines += [f'educoder_queue_depth{{stage="{stage}"}} {n}' for stage, n in snapshot["queue_depth"].items()]
+        lines += [
+            "# HELP educoder_ocr_fallback_total Files that were recognised by OCR.",
+            "# TYPE educoder_ocr_fallback_total counter",
+            f"educoder_ocr_fallback_total {snapshot['ocr']}",
+            "# HELP educoder_errors_total Files that ended with an error status.",
+            "# TYPE educoder_errors_total counter",
+        ]
+        lines += [f'educoder_errors_total{{status="{status}"}} {n}' for status, n in snapshot["errors"].items()]
+        lines += [
+            "# HELP educoder_elapsed_seconds Seconds since the run started.",
+            "# TYPE educoder_elapsed_seconds gauge",
+            f"educoder_elapsed_seconds {snapshot['elapsed']}",
+        ]
+
+        tmp_path = self.metrics_file + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.metrics_file)
+
+
+def _format_seconds(seconds: float) -> str:
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
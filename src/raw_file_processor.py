@@ -3,30 +3,63 @@
 模块功能：
     数据摄入层 (Ingest Layer)。
     主要负责解压原始文件，并扫描文件结构，构建最基础的学生信息列表（班级，学号，姓名，文件路径）。
+    支持免解压模式：直接从压缩包的 ZipInfo 构建清单，工作进程在内存中读取成员字节，不经过磁盘中转。
+    支持增量解压：对比压缩包成员的 CRC/大小与上次解压时记录的清单，只解压新增或变化的成员，并删除已不存在的旧文件。
+    支持流式摄入：边解压边产出学生信息，可多线程解压，让并行解析与解压重叠进行。
 
 依赖关系：
     os: 文件路径操作
     zipfile: 解压文件
     shutil: 清理文件夹
+    json: 增量解压的清单文件
+    threading / concurrent.futures: 多线程流式解压
     src.utils: 调用文本修复工具
 """
 import os
+import json
+import time
 import zipfile
+import posixpath
 import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
 from src.utils import fix_text_encoding
 
+# 增量解压清单，记录上次解压时每个成员的 CRC/大小及落盘位置
+MANIFEST_NAME = ".unzip_manifest.json"
 
-def unzip_file(zip_path, extract_to):
+
+def is_junk_member(zip_info) -> bool:
+    """
+    函数功能：
+        在 ZipInfo 层面过滤 Mac 系统生成的垃圾文件及目录条目。
+        这些特征都是 ASCII 字符，不需要先修复文件名编码，也不需要接触磁盘
+
+    Args:
+        zip_info (zipfile.ZipInfo): 压缩包成员
+
+    Returns:
+        bool: 需要跳过返回 True
+    """
+    name = zip_info.filename
+    return (zip_info.is_dir() or name.startswith('__MACOSX') or '._' in name or name.endswith('.DS_Store'))
+
+
+def unzip_file(zip_path, extract_to, incremental=False):
     """
     函数功能：
         通用解压函数，自动处理 Mac/Windows 编码差异及 __MACOSX 垃圾文件
     Args:
         zip_path (str): 压缩包的绝对路径。
         extract_to (str): 目标解压目录的路径。
+        incremental (bool): 是否增量解压。为 False 时先清空目录再全量解压
 
     Returns:
         bool: 解压成功返回 True，过程中发生任何异常返回 False。
     """
+    if incremental:
+        return _unzip_incremental(zip_path, extract_to)
+
     if os.path.exists(extract_to):
         try:
             shutil.rmtree(extract_to)
@@ -39,14 +72,13 @@ def unzip_file(zip_path, extract_to):
     try:
         with zipfile.ZipFile(zip_path, 'r') as zf:
             for file_info in zf.infolist():
-                # 1. 修复文件名编码 (调用 imported utils 中的工具)
-                original_name = file_info.filename
-                decoded_name = fix_text_encoding(original_name)
-
-                # 2. 过滤 Mac 系统生成的垃圾文件
-                if decoded_name.startswith('__MACOSX') or '._' in decoded_name or decoded_name.endswith('.DS_Store'):
+                # 1. 过滤 Mac 系统生成的垃圾文件
+                if is_junk_member(file_info):
                     continue
 
+                # 2. 修复文件名编码 (调用 imported utils 中的工具)
+                decoded_name = fix_text_encoding(file_info.filename)
+
                 # 3. 重写文件名并解压
                 # 我们需要保持目录结构，但使用修复后的名字
                 file_info.filename = decoded_name
@@ -59,6 +91,199 @@ def unzip_file(zip_path, extract_to):
         return False
 
 
+def _unzip_incremental(zip_path, extract_to):
+    """
+    函数功能：
+        增量解压：只解压新增或 CRC/大小发生变化的成员，删除压缩包中已不存在的旧文件。
+        解压出的文件会沿用压缩包内记录的修改时间，保证未变化的文件在多次运行之间保持稳定
+
+    Args:
+        zip_path (str): 压缩包的绝对路径。
+        extract_to (str): 目标解压目录的路径。
+
+    Returns:
+        bool: 解压成功返回 True，过程中发生任何异常返回 False。
+    """
+    print(f"正在增量解压: {os.path.basename(zip_path)} ...")
+    try:
+        for _ in iter_unzip(zip_path, extract_to, incremental=True):
+            pass
+        return True
+    except Exception as e:
+        print(f"解压严重错误: {e}")
+        return False
+
+
+def iter_unzip(zip_path, extract_to, incremental=True, threads=1):
+    """
+    函数功能：
+        流式解压生成器：每个成员一落盘 (或确认未变化) 就立即产出其路径，调用方无需等待整个压缩包解压完毕。
+        可使用多个线程并行解压，每个线程持有独立的 ZipFile 句柄；同时在途的解压任务数有上限，内存保持平稳
+
+    Args:
+        zip_path (str): 压缩包的绝对路径。
+        extract_to (str): 目标解压目录的路径。
+        incremental (bool): 是否增量解压 (对比清单跳过未变化成员)；为 False 时先清空目录
+        threads (int): 解压线程数
+
+    Yields:
+        str: 已就绪的文件在磁盘上的路径
+    """
+    if not incremental and os.path.exists(extract_to):
+        shutil.rmtree(extract_to, ignore_errors=True)
+    os.makedirs(extract_to, exist_ok=True)
+    manifest_path = os.path.join(extract_to, MANIFEST_NAME)
+
+    old_manifest = {}
+    if incremental:
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                old_manifest = json.load(f)
+        except (OSError, ValueError):
+            old_manifest = {}
+
+    local = threading.local()
+    handles = []
+    real_root = os.path.realpath(extract_to)
+
+    def extract(file_info, decoded_name):
+        zf = getattr(local, "zf", None)
+        if zf is None:
+            zf = local.zf = zipfile.ZipFile(zip_path, 'r')
+            handles.append(zf)
+        file_info.filename = decoded_name
+        target = zf.extract(file_info, extract_to)
+        mtime = time.mktime(file_info.date_time + (0, 0, -1))
+        os.utime(target, (mtime, mtime))
+        return decoded_name, {"crc": file_info.CRC, "size": file_info.file_size, "path": target}
+
+    new_manifest = {}
+    extracted = skipped = 0
+    max_pending = max(1, threads) * 4
+    try:
+        with zipfile.ZipFile(zip_path, 'r') as zf, ThreadPoolExecutor(max_workers=max(1, threads)) as pool:
+            pending = set()
+            for file_info in zf.infolist():
+                if is_junk_member(file_info):
+                    continue
+
+                decoded_name = fix_text_encoding(file_info.filename)
+                record = old_manifest.get(decoded_name)
+
+                # 清单一致且磁盘上的文件完好，直接跳过
+                if (record and record["crc"] == file_info.CRC and record["size"] == file_info.file_size
+                        and os.path.isfile(record["path"]) and os.path.getsize(record["path"]) == file_info.file_size):
+                    new_manifest[decoded_name] = record
+                    skipped += 1
+                    yield record["path"]
+                    continue
+
+                # 目标目录由生产者线程预先创建：多个线程同时为同一文件夹调用 makedirs 会互相冲突
+                target_dir = _member_target(real_root, decoded_name, file_info.is_dir())
+                if target_dir:
+                    os.makedirs(target_dir, exist_ok=True)
+                pending.add(pool.submit(extract, file_info, decoded_name))
+                if len(pending) < max_pending:
+                    continue
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, record = future.result()
+                    new_manifest[name] = record
+                    extracted += 1
+                    yield record["path"]
+
+            for future in as_completed(pending):
+                name, record = future.result()
+                new_manifest[name] = record
+                extracted += 1
+                yield record["path"]
+    finally:
+        for handle in handles:
+            handle.close()
+
+    removed = _remove_stale_files(extract_to, {r["path"] for r in new_manifest.values()} | {manifest_path})
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(new_manifest, f, ensure_ascii=False)
+
+    print(f"\n解压完成：新增/更新 {extracted} | 未变化 {skipped} | 删除 {removed} (已自动过滤 Mac 系统文件)")
+
+
+def _member_target(root, member_name, is_dir) -> str:
+    """
+    函数功能：
+        按 ZipFile.extract 相同的规则 (去掉盘符、空段、"." 与 "..") 计算成员解压后所在的目录
+
+    Returns:
+        str: 目录成员返回其自身路径，文件成员返回其上级目录；位于解压根目录时返回空字符串
+    """
+    parts = [p for p in os.path.splitdrive(member_name.replace('/', os.path.sep))[1].split(os.path.sep)
+             if p not in ('', os.path.curdir, os.path.pardir)]
+    if not is_dir:
+        parts = parts[:-1]
+    return os.path.join(root, *parts) if parts else ""
+
+
+def stream_assignment_files(zip_path, extract_to, incremental=True, threads=1):
+    """
+    函数功能：
+        流式版本的 "解压 + scan_assignment_files"：每解压出一份 pdf 就立即产出其学生信息，
+        解压与解析可以同时进行，第一份结果不必等到最后一个字节解压完
+
+    Args:
+        zip_path (str): 压缩包的绝对路径。
+        extract_to (str): 目标解压目录的路径。
+        incremental (bool): 是否增量解压
+        threads (int): 解压线程数
+
+    Yields:
+        dict: 与 scan_assignment_files 相同格式的学生信息字典
+    """
+    try:
+        for full_path in iter_unzip(zip_path, extract_to, incremental=incremental, threads=threads):
+            folder, file = os.path.split(full_path)
+            if file.endswith(".pdf") and not file.startswith("._"):
+                class_name = os.path.basename(os.path.dirname(folder))
+                yield _build_student_info(file, class_name, full_path)
+    except Exception as e:
+        # 与整包解压一致：解压出错时报告并结束该压缩包的清单，已产出的文件照常解析，不中断整个运行
+        print(f"解压严重错误: {e}")
+
+
+def count_zip_pdfs(zip_path) -> int:
+    """
+    函数功能：
+        只读取压缩包的中央目录，统计其中的 pdf 数量 (流式摄入时用于显示总进度)
+
+    Returns:
+        int: pdf 成员数
+    """
+    with zipfile.ZipFile(zip_path, 'r') as zf:
+        return sum(1 for member in zf.infolist()
+                   if not is_junk_member(member) and posixpath.basename(member.filename).endswith(".pdf"))
+
+
+def _remove_stale_files(root_path, keep_paths: set) -> int:
+    """
+    函数功能：
+        删除 root_path 下不在 keep_paths 中的文件，并清理因此变空的文件夹
+
+    Returns:
+        int: 删除的文件数
+    """
+    keep = {os.path.abspath(p) for p in keep_paths}
+    removed = 0
+    for root, dirs, files in os.walk(root_path, topdown=False):
+        for file in files:
+            full_path = os.path.abspath(os.path.join(root, file))
+            if full_path not in keep:
+                os.remove(full_path)
+                removed += 1
+        if root != root_path and not os.listdir(root):
+            os.rmdir(root)
+    return removed
+
+
 def scan_assignment_files(root_path):
     """
     函数功能：
@@ -77,36 +302,115 @@ def scan_assignment_files(root_path):
             if file.endswith(".pdf") and not file.startswith("._"):
                 full_path = os.path.join(root, file)
 
-                # 解析学号，姓名
-                try:
-                    name_part = file.replace('.pdf', '')
-                    if '+' in name_part:
-                        s_id, s_name = name_part.split('+', 1)
-                    else:
-                        s_id, s_name = "Unknown", name_part
-                except:
-                    s_id, s_name = "Error", "Error"
-
                 # 解析班级
                 try:
                     parent_dir = os.path.dirname(root)
                     class_name = os.path.basename(parent_dir)
-                    if "班" not in class_name and "未分班" not in class_name:
-                        # 简单的容错，防止取到中间层文件夹
-                        pass
                 except:
                     class_name = "未知"
 
-                basic_info.append({
-                    "班级": class_name,
-                    "学号": s_id,
-                    "姓名": s_name,
-                    "文件路径": full_path
-                })
+                basic_info.append(_build_student_info(file, class_name, full_path))
 
     return basic_info
 
 
+def _build_student_info(file_name, class_name, full_path) -> dict:
+    """
+    函数功能：
+        由 pdf 文件名 ("学号+姓名.pdf") 和所在班级构建一条学生基础信息，磁盘扫描与压缩包扫描共用
+
+    Returns:
+        dict: 包含 班级、学号、姓名、文件路径 的字典
+    """
+    # 解析学号，姓名
+    try:
+        name_part = file_name.replace('.pdf', '')
+        if '+' in name_part:
+            s_id, s_name = name_part.split('+', 1)
+        else:
+            s_id, s_name = "Unknown", name_part
+    except:
+        s_id, s_name = "Error", "Error"
+
+    if "班" not in class_name and "未分班" not in class_name:
+        # 简单的容错，防止取到中间层文件夹
+        pass
+
+    return {
+        "班级": class_name,
+        "学号": s_id,
+        "姓名": s_name,
+        "文件路径": full_path
+    }
+
+
+def scan_zip_members(zip_path):
+    """
+    函数功能：
+        免解压模式：直接根据压缩包的 ZipInfo 条目构建学生信息列表，不向磁盘写入任何文件。
+        '文件路径' 是 "压缩包路径/成员名" 形式的虚拟路径，仅作为唯一标识与展示用；
+        工作进程通过 '压缩包' 与 '压缩包成员' 两个字段从压缩包中读取 pdf 字节
+
+    Args:
+        zip_path (str): 压缩包的绝对路径。
+
+    Returns:
+        list[dict]: 返回字典列表，每个字典代表一份作业。
+    """
+    basic_info = []
+    print(f"正在扫描压缩包中的 PDF 文件...")
+
+    with zipfile.ZipFile(zip_path, 'r') as zf:
+        for member in zf.infolist():
+            if is_junk_member(member):
+                continue
+            decoded_name = fix_text_encoding(member.filename)
+            folder, file = posixpath.split(decoded_name)
+            if not file.endswith(".pdf"):
+                continue
+
+            # 与磁盘扫描一致：pdf 所在文件夹的上一级即为班级
+            class_name = posixpath.basename(posixpath.dirname(folder)) or "未知"
+            info = _build_student_info(file, class_name, os.path.join(zip_path, *decoded_name.split('/')))
+            info.update({
+                "压缩包": zip_path,
+                "压缩包成员": member.filename,
+                # 成员的 CRC 与大小可以直接作为内容指纹，供结果缓存使用，无需解压计算哈希
+                "内容校验": f"crc32-{member.CRC:08x}-{member.file_size}",
+                "文件大小": member.file_size,
+            })
+            basic_info.append(info)
+
+    return basic_info
+
+
+# 每个进程缓存已打开的压缩包句柄，避免每读一个成员都重新解析一次中央目录
+# 值为 ((修改时间, 大小), ZipFile)：同一路径上的压缩包被替换后，旧句柄会被关闭并重新打开
+_open_archives = {}
+
+
+def read_zip_member(zip_path, member_name) -> bytes:
+    """
+    函数功能：
+        从压缩包中读取单个成员的字节，压缩包句柄按进程缓存复用 (压缩包的修改时间或大小变化时重新打开)
+
+    Args:
+        zip_path (str): 压缩包的绝对路径。
+        member_name (str): ZipInfo 中的原始成员名 (未修复编码)
+
+    Returns:
+        bytes: 成员内容
+    """
+    stat = os.stat(zip_path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    entry = _open_archives.get(zip_path)
+    if entry is None or entry[0] != version:
+        if entry is not None:
+            entry[1].close()
+        entry = _open_archives[zip_path] = (version, zipfile.ZipFile(zip_path, 'r'))
+    return entry[1].read(member_name)
+
+
 def get_raw_zip_file(raw_dir: str) -> str:
     """
     函数功能：
@@ -121,4 +425,20 @@ def get_raw_zip_file(raw_dir: str) -> str:
     if not os.path.exists(raw_dir):
         return None
     files = [f for f in os.listdir(raw_dir) if f.endswith('.zip')]
-    return os.path.join(raw_dir, files[0]) if files else None
\ No newline at end of file
+    return os.path.join(raw_dir, files[0]) if files else None
+
+
+def get_raw_zip_files(raw_dir: str) -> list:
+    """
+    函数功能：
+        批量模式：列出原始数据目录中的全部 ZIP 文件 (按文件名排序)。
+
+    Args:
+        raw_dir (str): 原始数据文件夹路径。
+
+    Returns:
+        list[str]: ZIP 文件的绝对路径列表，目录不存在时返回空列表。
+    """
+    if not os.path.exists(raw_dir):
+        return []
+    return [os.path.join(raw_dir, f) for f in sorted(os.listdir(raw_dir)) if f.endswith('.zip')]
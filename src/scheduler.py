@@ -0,0 +1,578 @@
+# src/scheduler.py
+"""
+模块功能：
+    并行调度层。负责把作业清单分配给进程池，并把结果按文件路径合并回来。
+
+说明：
+    采用两级流水线 (Two-Stage Pipeline)：
+    1. 分诊池 (宽)：所有 pdf 先用 pdfplumber 快速解析，文本型 pdf 在这一步就直接出结果
+    2. OCR 池 (窄)：只有被标记为 NEEDS_OCR 的扫描件才会进入，且只有这里的进程持有 OCR 模型
+    这样廉价的文本解析不会排在几秒一次的 OCR 调用后面，总耗时只由 OCR 的积压量决定
+    提供结果缓存时，命中的文件在主进程中直接出结果，根本不会进入进程池；续跑日志 (src.checkpoint) 中已完成的文件同理
+    进入 OCR 池的扫描件会先攒成一批 (达到 batch 大小或等待超过 flush 超时即发车)，整批送入模型
+    进程数由 plan_resources 根据 CPU、可用内存与单进程内存占用确定；任务按文件大小从大到小派发以避免长尾
+    (流式清单无法整体排序，只在最近到达的 stream_lookahead 份之内取最大的派发)，
+    小文件 (多为文本型 pdf) 则打包成块，一次进程间往返处理多份
+    可为每个任务设定时限 (从任务在工作进程中真正开始执行时算起)：超时或崩溃的工作进程所在的进程池会被整体替换，
+    有嫌疑的文件逐个放进每个阶段唯一的单进程隔离池重跑 (进程数与模型数有上限)，
+    隔离后仍然超时的文件再走一次更便宜的 OCR 路径 (该降级结果不写入缓存)，最终失败记为 TIMEOUT_STATUS / 系统错误，
+    单个病态 pdf 不会拖住整批任务
+
+依赖关系：
+    concurrent.futures: 进程池与完成事件等待
+    psutil: 读取可用内存
+    src.pdf_handler: 两个阶段各自的执行单元
+    src.ocr_engine: OCR 进程的模型预加载钩子
+    src.cache: 文件内容指纹
+"""
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from collections import deque
+from functools import partial
+import multiprocessing
+import os
+import time
+import heapq
+import psutil
+
+from src.pdf_handler import enrich_batch, ocr_enrich_batch, NEEDS_OCR, RESULT_FIELDS, TIMEOUT_STATUS
+from src.ocr_engine import init_ocr_worker, ESCALATED_SUFFIX
+from src.cache import content_digest
+
+# 工作进程中记录任务开始时间的共享数组 (由进程池的 initializer 注入)
+_task_starts = None
+
+
+def _init_worker(task_starts, load_ocr_model=False):
+    """
+    函数功能：
+        进程池的 initializer：保存开始时间数组，OCR 进程按需预加载模型
+    """
+    global _task_starts
+    _task_starts = task_starts
+    if load_ocr_model:
+        init_ocr_worker()
+
+
+def _run_task(slot, func, *args):
+    """
+    函数功能：
+        在工作进程中执行任务：真正开始执行时先在共享数组的槽位中写入开始时间，
+        主进程据此判断超时与崩溃嫌疑 (任务提交后可能还在调用队列中排队，那段时间不能算作运行时间)
+        写入的是一个不加锁的 double，工作进程被强制结束也不会留下锁
+    """
+    if slot is not None:
+        _task_starts[slot] = time.time()
+    return func(*args)
+
+
+def plan_ocr_workers(memory_budget_mb: float, model_rss_mb: float, max_workers: int) -> int:
+    """
+    函数功能：
+        根据内存预算估算 OCR 池的进程数：N_ocr = 内存预算 / 单个模型常驻内存，保底 1 个
+
+    Args:
+        memory_budget_mb (float): 允许 OCR 进程占用的总内存 (MB)
+        model_rss_mb (float): 单个加载了模型的进程的常驻内存 (MB)
+        max_workers (int): 上限，一般为分诊池的进程数
+
+    Returns:
+        int: OCR 池的进程数
+    """
+    if model_rss_mb <= 0:
+        return max(1, max_workers)
+    return max(1, min(max_workers, int(memory_budget_mb // model_rss_mb)))
+
+
+def task_size(file_info: dict) -> int:
+    """
+    函数功能：
+        估算一份作业的处理成本 (以文件字节数近似)：免解压模式取 ZipInfo 记录的大小，否则读取磁盘文件大小
+    """
+    if "文件大小" in file_info:
+        return file_info["文件大小"]
+    try:
+        return os.path.getsize(file_info["文件路径"])
+    except OSError:
+        return 0
+
+
+def plan_resources(total_files: int, ocr_memory_budget_mb: float, ocr_worker_rss_mb: float,
+                   text_worker_rss_mb: float, reserve_mb: float = 1024, max_chunk: int = 32) -> dict:
+    """
+    函数功能：
+        根据 CPU 核心数、当前可用内存与单进程常驻内存，制定本次运行的调度计划
+
+    Args:
+        total_files (int): 本次任务的文件总数 (用于确定分块大小)
+        ocr_memory_budget_mb (float): OCR 进程允许占用的内存上限 (MB)
+        ocr_worker_rss_mb (float): 单个加载了模型的 OCR 进程的常驻内存 (MB)
+        text_worker_rss_mb (float): 单个分诊进程的常驻内存 (MB)
+        reserve_mb (float): 给系统与主进程预留的内存 (MB)
+        max_chunk (int): 小文件分块的上限
+
+    Returns:
+        dict: 调度计划，包含 cpu_count / available_mb / text_workers / ocr_workers / chunk_size
+    """
+    cpu_count = os.cpu_count() or 1# 获取 CPU 核心数
+    if cpu_count > 4:# 策略：N-2 策略 (高性能机型) 或 N-1 策略 (普通机型)，保底 1 进程
+        cpu_workers = cpu_count - 2
+    else:
+        cpu_workers = max(1, cpu_count - 1)
+
+    available_mb = psutil.virtual_memory().available / (1024 * 1024)
+    usable_mb = max(0.0, available_mb - reserve_mb)
+
+    # 先按内存约束分诊进程，剩余内存 (且不超过预算) 再分给 OCR 进程
+    text_workers = max(1, min(cpu_workers, int(usable_mb // max(text_worker_rss_mb, 1))))
+    ocr_budget = min(ocr_memory_budget_mb, usable_mb - text_workers * text_worker_rss_mb)
+    ocr_workers = plan_ocr_workers(max(ocr_budget, 0), ocr_worker_rss_mb, cpu_workers)
+
+    # 每个分诊进程大约分到 4 个块，既摊薄往返开销，又保证负载均衡
+    chunk_size = max(1, min(max_chunk, total_files // (text_workers * 4)))
+
+    return {
+        "cpu_count": cpu_count,
+        "available_mb": available_mb,
+        "text_workers": text_workers,
+        "ocr_workers": ocr_workers,
+        "chunk_size": chunk_size,
+    }
+
+
+def _largest_first(source, window: int):
+    """
+    函数功能：
+        在流式清单上按文件大小从大到小取任务：最多预读 window 份，每次取出其中最大的一份
+
+    Args:
+        source (Iterator[dict]): 任务清单
+        window (int): 预读窗口的大小
+
+    Returns:
+        Iterator[dict]: 重新排序后的任务清单
+    """
+    heap = [] # 小根堆：(-文件大小, 到达序号, 任务)，序号保证大小相同时按到达顺序
+    for seq, info in enumerate(source):
+        heapq.heappush(heap, (-task_size(info), seq, info))
+        if len(heap) >= window:
+            yield heapq.heappop(heap)[2]
+    while heap:
+        yield heapq.heappop(heap)[2]
+
+
+class TwoStageScheduler:
+    """
+    两级调度器。以上下文管理器的方式持有两个进程池：
+
+        with TwoStageScheduler(text_workers, ocr_workers) as scheduler:
+            results = scheduler.run(files_list, on_result=callback)
+    """
+
+    def __init__(self, text_workers: int, ocr_workers: int, preload_ocr: bool = True,
+                 ocr_batch_size: int = 8, ocr_flush_timeout: float = 2.0, ocr_options: dict = None,
+                 max_inflight: int = None, chunk_size: int = 1, small_file_bytes: int = 512 * 1024,
+                 largest_first: bool = True, stream_lookahead: int = 64, task_timeout: float = None,
+                 ocr_task_timeout: float = None,
+                 retry_options: dict = None, watch_interval: float = 1.0, profile: bool = False):
+        self.text_workers = text_workers
+        self.ocr_workers = ocr_workers
+        self.preload_ocr = preload_ocr
+        self.ocr_batch_size = max(1, ocr_batch_size)
+        self.ocr_flush_timeout = ocr_flush_timeout # 批次中最早的文件最多等待多少秒就必须发车
+        self.ocr_options = ocr_options or {} # 透传给 OCR 引擎的参数 (ROI 模板等)
+        # 同时在途的任务数上限：任务清单是流式产生时，防止一次性把所有任务堆进进程池的队列
+        self.max_inflight = max_inflight or (text_workers + ocr_workers) * 4
+        self.chunk_size = max(1, chunk_size) # 小文件打包成块，一块只需一次进程间往返
+        self.small_file_bytes = small_file_bytes # 小于该大小的文件才参与打包，大文件单独派发
+        self.largest_first = largest_first # 按文件大小从大到小派发，避免大文件落在队尾形成长尾
+        # 流式清单的排序窗口：预读这么多份，每次派发其中最大的一份；窗口越大越接近整体排序，
+        # 但开头要先等这么多份到达 (例如解压出来) 才开始派发。0 表示流式清单按到达顺序派发
+        self.stream_lookahead = stream_lookahead
+        # 单个文件的处理时限 (秒，None 表示不限)，多文件的任务按文件数等比放宽
+        self.task_timeout = task_timeout
+        self.ocr_task_timeout = ocr_task_timeout
+        # 超时文件的重试参数 (透传给 OCR 引擎，例如只识别区域、降低分辨率)，None 表示不重试
+        self.retry_options = retry_options
+        self.watch_interval = watch_interval # 开启超时控制时检查任务进度的间隔 (秒)
+        self.profile = profile # 是否在结果中记录逐阶段耗时 (见 src.profiler)
+        self.ocr_count = 0 # 本次运行进入 OCR 池的文件数
+        self.escalated_count = 0 # 本次运行中提高分辨率重新识别的扫描件数
+        self.timeout_count = 0 # 本次运行确认超时的文件数 (隔离重跑后仍然超时)
+        self.restart_count = 0 # 本次运行重建进程池的次数
+        self._queue_depth = {} # 各阶段在途任务数与 OCR 缓冲区长度，由 run 的主循环更新
+        self._text_pool = None
+        self._ocr_pool = None
+        self._isolation_pools = {} # 阶段 -> 单进程的隔离进程池 (按需创建，同一时间只运行一份重试)
+        # 任务开始时间的共享数组：在途任务数有上限，槽位循环使用 (槽位用完时退回主进程侧的近似判断)
+        self._task_starts = None
+        self._free_slots = []
+
+    def __enter__(self):
+        slots = self.max_inflight + 16
+        self._task_starts = multiprocessing.RawArray('d', slots)
+        self._free_slots = list(range(slots))
+        self._text_pool = self._create_pool("text")
+        self._ocr_pool = self._create_pool("ocr")
+        return self
+
+    def _create_pool(self, stage, workers=None):
+        if stage == "text":
+            return ProcessPoolExecutor(max_workers=workers or self.text_workers,
+                                       initializer=_init_worker, initargs=(self._task_starts,))
+        # OCR 池的进程在第一次提交任务时才会启动，全是文本型 pdf 的批次不会加载任何模型
+        return ProcessPoolExecutor(max_workers=workers or self.ocr_workers,
+                                   initializer=_init_worker, initargs=(self._task_starts, self.preload_ocr))
+
+    def _pool(self, stage):
+        return self._ocr_pool if stage == "ocr" else self._text_pool
+
+    @staticmethod
+    def _kill_pool(pool):
+        # 结束进程池中的全部工作进程 (包括卡死的进程)，未开始的任务直接取消
+        if hasattr(pool, "terminate_workers"): # Python 3.14 起提供的公开接口
+            pool.terminate_workers()
+        else:
+            # 更早的版本没有公开接口，只能通过 _processes 拿到工作进程 (tests/test_scheduler.py 覆盖了这条路径)
+            for proc in list((getattr(pool, "_processes", None) or {}).values()):
+                proc.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _restart_pool(self, stage):
+        """
+        函数功能：
+            结束某个阶段进程池中的全部工作进程并换上新的进程池
+        """
+        self._kill_pool(self._pool(stage))
+        if stage == "ocr":
+            self._ocr_pool = self._create_pool("ocr")
+        else:
+            self._text_pool = self._create_pool("text")
+        self.restart_count += 1
+
+    def _close_isolation(self):
+        # 一次运行结束后释放隔离进程 (OCR 隔离进程持有一份模型)
+        for pool in self._isolation_pools.values():
+            pool.shutdown(wait=False)
+        self._isolation_pools = {}
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._close_isolation()
+        self._text_pool.shutdown(wait=True)
+        self._ocr_pool.shutdown(wait=True)
+        return False
+
+    def warm_up(self):
+        """
+        函数功能：
+            常驻服务启动时调用：向两个进程池各提交一轮空任务，促使工作进程 (以及 OCR 模型) 立即就绪，
+            而不是等到第一个任务到来时才冷启动
+        """
+        futures = [self._text_pool.submit(int) for _ in range(self.text_workers)]
+        futures += [self._ocr_pool.submit(int) for _ in range(self.ocr_workers)]
+        wait(futures)
+
+    def get_queue_depth(self) -> dict:
+        """
+        函数功能：
+            返回当前的队列深度：{"text": 分诊池在途任务数, "ocr": OCR 池在途任务数, "ocr_buffer": 等待组批的扫描件数}
+            可以在其他线程中调用 (例如进度输出线程)，不在运行中时返回空字典
+        """
+        return self._queue_depth
+
+    def run(self, files_list, on_result=None, cache=None, project=None, journal=None) -> list:
+        """
+        函数功能：
+            调度一批作业，哪个先完成就先处理哪个，分诊出的扫描件立即转交 OCR 池
+            任务清单可以是列表，也可以是边解压边产出的生成器，在途任务数受 max_inflight 限制
+
+        Args:
+            files_list (Iterable[dict]): scan_assignment_files / stream_assignment_files 得到的基础信息
+            on_result (callable): 每得到一份最终结果就回调一次，参数为结果字典
+            cache (ResultCache): 可选的结果缓存，命中的文件不再解析，新解析的结果会写回缓存
+            project (callable): 可选，完整结果交给 on_result 之后，只保留 project(结果) 用于返回，
+                完整明细由 on_result 负责写出时，内存中只留轻量记录
+            journal (RunJournal): 可选的断点续跑日志，日志中已完成的文件直接出结果，新结果会追加到日志
+
+        Returns:
+            list[dict]: 与 files_list 顺序一致的结果列表 (按 '文件路径' 合并)
+        """
+        self.ocr_count = 0
+        self.escalated_count = 0
+        self.timeout_count = 0
+        self.restart_count = 0
+        try:
+            return _Run(self, files_list, on_result, cache, project, journal).execute()
+        finally:
+            self._close_isolation()
+            self._queue_depth = {}
+
+
+class _Run:
+    """
+    TwoStageScheduler.run 的一次运行状态：在途任务、组批缓冲区、隔离重试队列，以及超时与崩溃的恢复逻辑
+    """
+
+    def __init__(self, scheduler: TwoStageScheduler, files_list, on_result, cache, project, journal):
+        self.scheduler = scheduler
+        self.on_result = on_result
+        self.cache = cache
+        self.project = project
+        self.journal = journal
+        self.triage = partial(enrich_batch, allow_ocr=False, profile=scheduler.profile)
+        self.merged = {}
+        self.digests = {} # 文件路径 -> 内容哈希，用于把新结果写回缓存
+        self.tasks = {} # future -> 任务 (所属阶段、文件、参数、第几次尝试、所在进程池、计时槽位、开始时间)
+        self.isolation = {"text": deque(), "ocr": deque()} # 等待进入隔离进程的重试
+        self.exhausted = False
+        self.chunk = [] # 等待打包的小文件
+        self.ocr_buffer = [] # 等待组批的扫描件
+        self.buffer_since = None # 缓冲区中最早一份扫描件的到达时间
+
+        if isinstance(files_list, list):
+            self.order = [info["文件路径"] for info in files_list] # 任务清单的原始顺序
+            self.source = iter(sorted(files_list, key=task_size, reverse=True) if scheduler.largest_first
+                               else files_list)
+        else:
+            self.order = [] # 流式清单无法预知顺序，按到达顺序边取边记录
+            self.source = self._arrivals(files_list)
+            if scheduler.largest_first and scheduler.stream_lookahead > 0:
+                self.source = _largest_first(self.source, scheduler.stream_lookahead)
+
+    def execute(self) -> list:
+        scheduler = self.scheduler
+        tasks = self.tasks
+        watch = scheduler.task_timeout or scheduler.ocr_task_timeout
+        self.feed()
+        while tasks or self.ocr_buffer or any(self.isolation.values()):
+            # 整体替换字典 (而不是原地修改)，其他线程随时读取都能拿到一致的快照
+            stages = [task["stage"] for task in tasks.values()]
+            scheduler._queue_depth = {"text": stages.count("text"), "ocr": stages.count("ocr"),
+                                      "ocr_buffer": len(self.ocr_buffer)}
+            timeout = None
+            if self.ocr_buffer:
+                timeout = max(0.0, self.buffer_since + scheduler.ocr_flush_timeout - time.time())
+            if watch:
+                # 开启超时控制时定期醒来，检查任务是否超时
+                timeout = min(timeout, scheduler.watch_interval) if timeout is not None else scheduler.watch_interval
+            done, _ = wait(tasks, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            # 读取工作进程写下的开始时间，用于超时判断与崩溃时的嫌疑判断
+            self.update_started()
+
+            # 两个进程池返回的都是结果列表 (分诊块 / OCR 批次)
+            for future in done:
+                if future not in tasks:
+                    continue # 已随崩溃的进程池一并处理
+                task = self.take(future)
+                try:
+                    results = future.result()
+                except BrokenProcessPool:
+                    # 工作进程崩溃 (段错误、内存耗尽被杀等)，同一进程池的其他任务也会以此异常返回
+                    if task["pool"] is scheduler._pool(task["stage"]):
+                        self.recover(task["stage"], [task], timed_out=False)
+                    else:
+                        self.discard_isolation(task)
+                        self.fail(task, timed_out=False)
+                    continue
+                self.accept(task, results)
+
+            if watch:
+                self.check_deadlines()
+            self.feed()
+            self.pump_isolation()
+
+            # 发车条件：批次已满 / 最早的文件等待超时 / 已经没有别的任务可等
+            if self.ocr_buffer and (len(self.ocr_buffer) >= scheduler.ocr_batch_size
+                                    or time.time() - self.buffer_since >= scheduler.ocr_flush_timeout
+                                    or not tasks):
+                self.flush()
+
+        return [self.merged[path] for path in self.order]
+
+    def _arrivals(self, files_list):
+        for info in files_list:
+            self.order.append(info["文件路径"])
+            yield info
+
+    def submit(self, stage, infos, options=None, attempt=0):
+        if attempt:
+            # 重试的文件排队进入该阶段唯一的隔离进程 (单进程、可复用)，一次只运行一份：
+            # 再失败就能确定是它自己的问题，也不会牵连其他文件，重试再多也不会额外启动进程或加载模型
+            self.isolation[stage].append((infos, options, attempt))
+            self.pump_isolation()
+        else:
+            self.dispatch(self.scheduler._pool(stage), stage, infos, options, attempt)
+
+    def dispatch(self, pool, stage, infos, options, attempt):
+        # 分配一个计时槽位，工作进程真正开始执行时在槽位中写入开始时间
+        scheduler = self.scheduler
+        slot = scheduler._free_slots.pop() if scheduler._free_slots else None
+        if slot is not None:
+            scheduler._task_starts[slot] = 0.0
+        if stage == "ocr":
+            future = pool.submit(_run_task, slot, ocr_enrich_batch, infos, options or scheduler.ocr_options,
+                                 scheduler.profile)
+        else:
+            future = pool.submit(_run_task, slot, self.triage, infos)
+        self.tasks[future] = {"stage": stage, "infos": infos, "options": options, "attempt": attempt,
+                              "pool": pool, "slot": slot, "started": None}
+
+    def pump_isolation(self):
+        # 隔离进程空闲时派发下一份重试
+        pools = self.scheduler._isolation_pools
+        busy = {task["stage"] for task in self.tasks.values() if task["attempt"]}
+        for stage, backlog in self.isolation.items():
+            if backlog and stage not in busy:
+                if stage not in pools:
+                    pools[stage] = self.scheduler._create_pool(stage, workers=1)
+                infos, options, attempt = backlog.popleft()
+                self.dispatch(pools[stage], stage, infos, options, attempt)
+
+    def take(self, future):
+        task = self.tasks.pop(future)
+        if task["slot"] is not None:
+            self.scheduler._free_slots.append(task["slot"])
+        return task
+
+    def update_started(self):
+        now = time.time()
+        for future, task in self.tasks.items():
+            if task["started"] is not None:
+                continue
+            if task["slot"] is not None:
+                task["started"] = self.scheduler._task_starts[task["slot"]] or None
+            elif future.running() or future.done():
+                task["started"] = now # 没有分到计时槽位时，退回到 "进入调用队列即视为开始" 的近似判断
+
+    def flush(self):
+        buffer = self.ocr_buffer
+        self.ocr_buffer, self.buffer_since = [], None
+        self.submit("ocr", buffer)
+
+    def submit_chunk(self):
+        chunk = self.chunk
+        self.chunk = []
+        self.submit("text", chunk)
+
+    def collect(self, res, resumed=False, cacheable=True):
+        path = res["文件路径"]
+        if self.journal is not None and not resumed:
+            self.journal.record(res, {k: res[k] for k in RESULT_FIELDS if k in res})
+        if path in self.digests:
+            digest = self.digests.pop(path)
+            if cacheable:
+                self.cache.put(digest, {k: res[k] for k in RESULT_FIELDS if k in res})
+        if self.on_result:
+            self.on_result(res)
+        self.merged[path] = self.project(res) if self.project else res
+
+    def accept(self, task, results):
+        scheduler = self.scheduler
+        # 超时后走简化路径 (只识别区域、低分辨率) 得到的结果是降级结果，不写入缓存，下次运行重新完整解析
+        degraded = task["attempt"] == 2
+        for res in results:
+            if task["stage"] == "ocr":
+                scheduler.escalated_count += str(res.get("识别方式", "")).endswith(ESCALATED_SUFFIX)
+            if res.get("状态") == NEEDS_OCR:
+                # 第二阶段：扫描件先进入缓冲区，等待组批后交给持有模型的窄进程池
+                scheduler.ocr_count += 1
+                if not self.ocr_buffer:
+                    self.buffer_since = time.time()
+                self.ocr_buffer.append(res)
+            else:
+                self.collect(res, cacheable=not degraded)
+
+    def fail(self, task, timed_out):
+        scheduler = self.scheduler
+        # 第一次失败：任务中的每个文件单独隔离重跑，找出真正出问题的那一份
+        if task["attempt"] == 0:
+            for info in task["infos"]:
+                self.submit(task["stage"], [info], task["options"], attempt=1)
+            return
+        info = task["infos"][0]
+        if timed_out:
+            scheduler.timeout_count += task["attempt"] == 1 # 隔离运行仍然超时，确认是该文件本身的问题
+            if task["attempt"] == 1 and scheduler.retry_options is not None:
+                # 隔离运行仍然超时：改走更便宜的路径再试一次 (只识别模板区域、降低渲染分辨率)
+                scheduler.ocr_count += task["stage"] == "text"
+                self.submit("ocr", [info], {**scheduler.ocr_options, **scheduler.retry_options}, attempt=2)
+                return
+            info.update({"状态": TIMEOUT_STATUS, "耗时": "0", "异常备注": "解析超时，已终止对应的工作进程"})
+        else:
+            info.update({"状态": "系统错误", "耗时": "0", "异常备注": "工作进程异常退出"})
+        self.collect(info)
+
+    def discard_isolation(self, task):
+        # 隔离进程超时或崩溃：结束它，下一份重试到来时再重新创建
+        pools = self.scheduler._isolation_pools
+        self.scheduler._kill_pool(task["pool"])
+        if pools.get(task["stage"]) is task["pool"]:
+            del pools[task["stage"]]
+
+    def recover(self, stage, failed, timed_out):
+        # ProcessPoolExecutor 不能中断单个任务：结束整个进程池的进程并重建
+        # 已经在工作进程中开始运行的任务都有嫌疑 (崩溃时无法确定是哪一个)，尚未开始的任务原样重新提交
+        self.update_started()
+        pool = self.scheduler._pool(stage)
+        others = [(f, self.take(f)) for f in [f for f, t in self.tasks.items() if t["pool"] is pool]]
+        self.scheduler._restart_pool(stage)
+        for future, task in others:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self.accept(task, future.result()) # 进程池出事之前已经完成的任务
+            elif not timed_out and task["started"] is not None:
+                failed.append(task)
+            else:
+                self.submit(stage, task["infos"], task["options"])
+        for task in failed:
+            self.fail(task, timed_out)
+
+    def check_deadlines(self):
+        scheduler = self.scheduler
+        now = time.time()
+        expired = []
+        for future, task in self.tasks.items():
+            limit = scheduler.ocr_task_timeout if task["stage"] == "ocr" else scheduler.task_timeout
+            if task["started"] is not None and limit and now - task["started"] > limit * len(task["infos"]):
+                expired.append(future)
+
+        shared = {}
+        for future in expired:
+            task = self.take(future)
+            if task["attempt"]:
+                self.discard_isolation(task) # 隔离进程中只有这一个任务，直接结束
+                self.fail(task, timed_out=True)
+            else:
+                shared.setdefault(task["stage"], []).append(task)
+        for stage, failed in shared.items():
+            self.recover(stage, failed, timed_out=True)
+
+    def feed(self):
+        # 从任务清单中取任务，直到在途任务数达到上限或清单耗尽
+        scheduler = self.scheduler
+        while not self.exhausted and len(self.tasks) < scheduler.max_inflight:
+            info = next(self.source, None)
+            if info is None:
+                self.exhausted = True
+                if self.chunk:
+                    self.submit_chunk()
+                break
+            if self.journal is not None:
+                done = self.journal.get(info)
+                if done is not None:
+                    self.collect({**info, **done}, resumed=True)
+                    continue
+            if self.cache is not None:
+                digest = content_digest(info)
+                cached = self.cache.get(digest)
+                if cached is not None:
+                    self.collect({**info, **cached})
+                    continue
+                self.digests[info["文件路径"]] = digest
+
+            if scheduler.chunk_size > 1 and task_size(info) < scheduler.small_file_bytes:
+                self.chunk.append(info)
+                if len(self.chunk) >= scheduler.chunk_size:
+                    self.submit_chunk()
+            else:
+                self.submit("text", [info])
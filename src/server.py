@@ -0,0 +1,215 @@
+# src/server.py
+"""
+模块功能：
+    常驻服务模式。进程池与 OCR 模型在服务启动时加载一次，之后通过本地 HTTP 接口接收任务，
+    每个任务 (一个压缩包或一个已解压的目录) 只需支付真正的解析耗时，不再重复冷启动。
+
+说明：
+    任务按提交顺序排队，由唯一的后台线程依次交给同一个 TwoStageScheduler 执行 (一个任务就能占满进程池)
+    已结束的任务只保留有限的数量与时长 (超过保留时长或数量上限的旧任务连同结果一起被清除，再查询返回 404)
+    接口一览：
+        POST /jobs                      提交任务，body: {"path": "压缩包或目录的路径"}
+        GET  /jobs/<id>                 查询任务状态与进度
+        GET  /jobs/<id>/stream          以 NDJSON 流式返回逐个文件的解析结果 (任务未完成时持续推送)
+        GET  /jobs/<id>/result          返回分类结果，?format=json (默认) 或 ?format=xlsx
+
+依赖关系：
+    flask: HTTP 接口
+    threading / queue: 任务队列与后台执行线程
+    src.layer: 分类预警
+    src.exporter: 以流式方式导出 xlsx 结果
+"""
+import io
+import json
+import queue
+import threading
+import time
+import uuid
+
+from flask import Flask, Response, jsonify, request, send_file
+
+from src.layer import classify
+from src.exporter import write_report
+
+
+class Job:
+    """
+    一个解析任务。rows 随着文件完成不断追加，等待者通过 cond 得到通知
+    """
+
+    def __init__(self, path: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.path = path
+        self.state = "queued" # queued / running / done / failed
+        self.total = 0
+        self.rows = []
+        self.error = ""
+        self.result = None # 分类结果 DataFrame
+        self.finished_at = None # 任务结束 (done / failed) 的时间
+        self.cond = threading.Condition()
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "path": self.path,
+            "state": self.state,
+            "total": self.total,
+            "finished": len(self.rows),
+            "error": self.error,
+        }
+
+
+class JobRunner:
+    """
+    任务队列。持有已经预热的调度器，后台线程逐个执行任务
+    """
+
+    def __init__(self, scheduler, build_manifest, cache=None, max_finished_jobs=100, job_ttl=24 * 3600):
+        """
+        Args:
+            scheduler (TwoStageScheduler): 已进入上下文 (进程池已创建) 的调度器
+            build_manifest (callable): path -> (任务清单, 文件总数)，清单为 None 表示路径无效或解压失败
+            cache (ResultCache): 可选的结果缓存
+            max_finished_jobs (int): 最多保留多少个已结束的任务 (连同其结果)
+            job_ttl (float): 已结束的任务保留多少秒，None 表示不按时间清除
+        """
+        self.scheduler = scheduler
+        self.build_manifest = build_manifest
+        self.cache = cache
+        self.max_finished_jobs = max_finished_jobs
+        self.job_ttl = job_ttl
+        self.jobs = {} # 按提交顺序排列
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def submit(self, path: str) -> Job:
+        job = Job(path)
+        with self._lock:
+            self.jobs[job.id] = job
+        self._queue.put(job)
+        return job
+
+    def evict(self) -> int:
+        """
+        函数功能：
+            清除超过保留时长或超出数量上限的已结束任务 (从最早提交的开始)，排队中与运行中的任务不受影响
+
+        Returns:
+            int: 清除的任务数
+        """
+        now = time.time()
+        with self._lock:
+            finished = [job for job in self.jobs.values() if job.finished_at is not None]
+            expired = {job.id for job in finished if self.job_ttl is not None and now - job.finished_at > self.job_ttl}
+            remaining = [job for job in finished if job.id not in expired]
+            expired.update(job.id for job in remaining[:max(0, len(remaining) - self.max_finished_jobs)])
+            for job_id in expired:
+                del self.jobs[job_id]
+        return len(expired)
+
+    def _loop(self):
+        while True:
+            job = self._queue.get()
+            self._run(job)
+
+    def _run(self, job: Job):
+        def on_result(res):
+            with job.cond:
+                job.rows.append(res)
+                job.cond.notify_all()
+
+        try:
+            files, total = self.build_manifest(job.path)
+            if files is None:
+                raise ValueError(f"无法读取任务路径: {job.path}")
+            job.total = total
+            job.state = "running"
+            results = self.scheduler.run(files, on_result=on_result, cache=self.cache)
+            job.result = classify(results)
+            job.state = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.state = "failed"
+        finally:
+            job.finished_at = time.time()
+            with job.cond:
+                job.cond.notify_all()
+            self.evict()
+
+
+def create_app(runner: JobRunner) -> Flask:
+    """
+    函数功能：
+        创建 Flask 应用并注册任务接口
+
+    Args:
+        runner (JobRunner): 任务队列
+
+    Returns:
+        Flask: 应用实例
+    """
+    app = Flask(__name__)
+    app.json.ensure_ascii = False
+
+    def find_job(job_id):
+        job = runner.jobs.get(job_id)
+        if job is None:
+            return None, (jsonify({"error": "job not found"}), 404)
+        return job, None
+
+    @app.post("/jobs")
+    def submit_job():
+        path = (request.get_json(silent=True) or {}).get("path")
+        if not path:
+            return jsonify({"error": "缺少 path 参数"}), 400
+        job = runner.submit(path)
+        return jsonify(job.to_dict()), 202
+
+    @app.get("/jobs/<job_id>")
+    def job_status(job_id):
+        job, err = find_job(job_id)
+        return err or jsonify(job.to_dict())
+
+    @app.get("/jobs/<job_id>/stream")
+    def job_stream(job_id):
+        job, err = find_job(job_id)
+        if err:
+            return err
+
+        def generate():
+            sent = 0
+            while True:
+                with job.cond:
+                    while sent >= len(job.rows) and job.state in ("queued", "running"):
+                        job.cond.wait(timeout=5)
+                    rows = job.rows[sent:]
+                    finished = job.state in ("done", "failed")
+                for row in rows:
+                    yield json.dumps(row, ensure_ascii=False) + "\n"
+                sent += len(rows)
+                if finished and sent >= len(job.rows):
+                    break
+
+        return Response(generate(), mimetype="application/x-ndjson")
+
+    @app.get("/jobs/<job_id>/result")
+    def job_result(job_id):
+        job, err = find_job(job_id)
+        if err:
+            return err
+        if job.state != "done":
+            return jsonify(job.to_dict()), 409
+
+        if request.args.get("format") == "xlsx":
+            buf = io.BytesIO()
+            write_report([job.result], buf, fmt="xlsx")
+            buf.seek(0)
+            return send_file(buf, download_name=f"{job.id}.xlsx", as_attachment=True,
+                             mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+        return Response(job.result.to_json(orient="records", force_ascii=False),
+                        mimetype="application/json")
+
+    return app
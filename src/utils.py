@@ -2,17 +2,22 @@
 """
 模块功能：
     本模块类似于一个工具箱，存放通用的、不依赖于具体业务逻辑的底层工具函数。
-    1. 打印动态进度条 (UI)
-    2. 文本编码自适应修复
-    3. 将“x天x小时x分钟x秒”转化为对应的分钟数
+    1. 文本编码自适应修复
+    2. 将“x天x小时x分钟x秒”转化为对应的分钟数
 
 依赖关系：
-    sys: 打印进度条
     re: 从字符串中提取出对应的时间正则式
+    pandas / numpy: 整列耗时的批量转换
 """
 
-import sys
 import re
+import numpy as np
+import pandas as pd
+
+# 耗时文本的通用正则 (pdf 文本解析与 OCR 共用)，(?!班) 防止匹配到“分班”的分；"小时" 需排在 "时" 之前
+DURATION_PATTERN = re.compile(r'((\d+)\s*(天|小时|时|分(?!班)|秒)\s*)+')
+# 耗时文本中的 "数值 + 单位"，预编译后供 parse_time_to_minutes 反复使用
+TIME_UNIT_PATTERN = re.compile(r'(\d+)(天|小时|时|分|秒)')
 
 
 def parse_time_to_minutes(time_str: str) -> float:
@@ -30,7 +35,7 @@ def parse_time_to_minutes(time_str: str) -> float:
         return 0.0
     clean_str = str(time_str).replace(" ", "")#防止读出来带空格的字符串导致无法识别
     total_minutes = 0.0
-    matches = re.findall(r'(\d+)(天|小时|时|分|秒)', clean_str)
+    matches = TIME_UNIT_PATTERN.findall(clean_str)
 
     for val, unit in matches:
         num = float(val)
@@ -46,6 +51,24 @@ def parse_time_to_minutes(time_str: str) -> float:
     return round(total_minutes, 2)
 
 
+def parse_durations(durations: pd.Series) -> pd.Series:
+    """
+    函数功能：
+        整列版本的 parse_time_to_minutes：耗时文本大量重复 (如 "0"、"--"、相同的时分秒)，
+        先用 factorize 取出不重复的取值，每个取值只解析一次，再按编码整列取回，结果与逐行调用完全一致
+
+    Args:
+        durations (pd.Series): 耗时文本列
+
+    Returns:
+        pd.Series: 对应的分钟数 (float)，索引与输入一致
+    """
+    codes, uniques = pd.factorize(durations)
+    # 末尾追加缺失值 (编码 -1) 对应的结果，numpy 的负下标正好取到它
+    table = np.array([parse_time_to_minutes(v) for v in uniques] + [parse_time_to_minutes(None)], dtype=float)
+    return pd.Series(table[codes], index=durations.index)
+
+
 def fix_text_encoding(text):
     """
     函数功能：
@@ -73,30 +96,3 @@ def fix_text_encoding(text):
             continue
 
     return text # 如果都失败了，返回原始乱码，至少比报错强
-
-
-def print_progress(iteration, total, current_item="", bar_length=40):
-    """
-    函数功能：
-        在控制台中显示单行动态进度条。
-
-    Args:
-        iteration (int): 当前进度（分子）。
-        total (int): 总任务数（分母）。
-        current_item (str): 当前正在处理的项目名称（用于显示在进度条后面）。
-        bar_length (int): 进度条的长度字符数。
-    """
-    if total == 0:
-        return
-
-    percent = 100 * (iteration / float(total))
-    filled_length = int(bar_length * iteration // total)
-    bar = '#' * filled_length + '-' * (bar_length - filled_length)
-
-    # 截断过长的文件名，保持 UI 整洁
-    if len(current_item) > 20:
-        current_item = current_item[:17] + "..."
-
-    # 使用 \r 回车符实现单行刷新
-    sys.stdout.write(f'\r[{bar}] {percent:.1f}% | Processing: {current_item:<20}')
-    sys.stdout.flush()
\ No newline at end of file
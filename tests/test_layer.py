@@ -0,0 +1,24 @@
+# tests/test_layer.py
+"""
+模块功能：
+    src.layer 的单元测试：班级基准的计算与兜底
+"""
+from src.layer import classify
+
+
+def _row(sid, class_name, duration, status="按时通关"):
+    return {"姓名": f"学生{sid}", "学号": str(sid), "班级": class_name, "状态": status, "耗时": duration}
+
+
+def test_rows_without_class_fall_back_to_default_bounds():
+    # 全部有效数据都没有班级时，使用默认边界 (10 / 240 分钟)
+    df = classify([_row(1, None, "30分"), _row(2, None, "5分"), _row(3, None, "5时")])
+    assert df["分类标签"].tolist() == ["正常", "红色 (疑似秒刷)", "黄色 (学习吃力)"]
+
+
+def test_class_bounds_from_quartiles():
+    rows = [_row(i, "一班", f"{60 + i}分") for i in range(10)] + [_row(10, "一班", "3分"), _row(11, "一班", "8时")]
+    labels = dict(zip(classify(rows)["学号"], classify(rows)["分类标签"]))
+    assert labels["0"] == "正常"
+    assert labels["10"] == "红色 (疑似秒刷)"
+    assert labels["11"] == "黄色 (学习吃力)"
@@ -0,0 +1,78 @@
+# tests/test_longitudinal.py
+"""
+模块功能：
+    src.longitudinal 的单元测试：流式分位数的精度、学生的区分、重复纳入作业时的计数与班级分布、状态的保存与恢复
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.longitudinal import LongitudinalModel, P2Quantile, RUSH_LABEL
+
+
+def _df(rows):
+    # rows: (姓名, 学号, 班级, 耗时(分钟), 分类标签)
+    return pd.DataFrame([{"姓名": name, "学号": sid, "班级": class_name, "耗时(分钟)": minutes,
+                          "状态": "按时通关", "分类标签": label}
+                         for name, sid, class_name, minutes, label in rows])
+
+
+def _estimate(values, quantiles=(0.25, 0.5, 0.75)):
+    sketches = [P2Quantile(p) for p in quantiles]
+    for x in values:
+        for sketch in sketches:
+            sketch.add(float(x))
+    return [sketch.value() for sketch in sketches]
+
+
+@pytest.mark.parametrize("n", range(1, 11))
+def test_small_samples_match_numpy(n):
+    values = np.random.default_rng(n).uniform(1, 300, n)
+    assert _estimate(values) == pytest.approx(np.quantile(values, [0.25, 0.5, 0.75]).tolist())
+
+
+def test_large_samples_close_to_numpy():
+    values = np.random.default_rng(0).lognormal(4, 0.6, 20000)
+    expected = np.quantile(values, [0.25, 0.5, 0.75])
+    iqr = expected[2] - expected[0]
+    assert np.abs(np.array(_estimate(values)) - expected).max() < 0.05 * iqr
+
+
+def test_students_without_id_are_not_merged():
+    model = LongitudinalModel(escalate_after=2)
+    for assignment in ("作业1", "作业2"):
+        df = model.update(assignment, _df([("张三", "Unknown", "一班", 1, RUSH_LABEL),
+                                           ("李四", "Unknown", "一班", 1, RUSH_LABEL)]))
+    assert len(model.students) == 2
+    assert df["累计预警次数"].tolist() == [2, 2]
+
+
+def test_student_history_follows_id_across_classes():
+    model = LongitudinalModel(escalate_after=2)
+    model.update("作业1", _df([("张三", "1", "未分班", 1, RUSH_LABEL)]))
+    df = model.update("作业2", _df([("张三", "1", "计科1班", 1, RUSH_LABEL)]))
+    assert len(model.students) == 1
+    assert df["纵向预警"].tolist() == ["红色 (反复秒刷 2 次)"]
+
+
+def test_reingest_counts_labels_once_and_adds_new_students_to_class():
+    model = LongitudinalModel()
+    model.update("作业1", _df([("张三", "1", "一班", 30, RUSH_LABEL)]))
+    df = model.update("作业1", _df([("张三", "1", "一班", 30, RUSH_LABEL), ("李四", "2", "一班", 50, "正常")]))
+
+    assert df["累计预警次数"].tolist() == [1, 0]
+    baselines = model.class_baselines().set_index("班级")
+    assert baselines.loc["一班", "作业数"] == 1
+    assert baselines.loc["一班", "样本数"] == 2
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "state.json")
+    model = LongitudinalModel()
+    model.update("作业1", _df([("张三", "1", "一班", 30, RUSH_LABEL)]))
+    model.save(path)
+
+    restored = LongitudinalModel.load(path)
+    df = restored.update("作业2", _df([("张三", "1", "一班", 40, RUSH_LABEL)]))
+    assert df["累计预警次数"].tolist() == [2]
+    assert restored.class_baselines().set_index("班级").loc["一班", "样本数"] == 2
@@ -0,0 +1,34 @@
+# tests/test_ocr_engine.py
+"""
+模块功能：
+    src.ocr_engine 的单元测试：识别结果是否完整的判定，以及由此决定的识别轮数 (用替身代替 OCR 模型)
+"""
+import numpy as np
+
+import src.ocr_engine as ocr_engine
+
+
+def _stub(monkeypatch, lines):
+    calls = []
+
+    def recognize_images(images):
+        calls.append(len(images))
+        return [list(lines) for _ in images]
+
+    monkeypatch.setattr(ocr_engine, "recognize_images", recognize_images)
+    monkeypatch.setattr(ocr_engine, "render_page", lambda path, dpi=100, page_index=0: np.zeros((100, 100, 3), np.uint8))
+    return calls
+
+
+def test_zero_duration_counts_as_found(monkeypatch):
+    calls = _stub(monkeypatch, [("未开启", 0.99), ("实训总耗时 0", 0.98)])
+    results = ocr_engine.ocr_process_batch(["a.pdf"], dpi=100, escalate_dpi=200, min_confidence=0.85)
+    assert results == [{"状态": "未开启", "耗时": "0", "识别方式": "OCR-ROI"}]
+    assert len(calls) == 1 # 只识别了一轮 ROI，没有退回整页，也没有提高分辨率
+
+
+def test_missing_duration_falls_back_and_escalates(monkeypatch):
+    calls = _stub(monkeypatch, [("按时通关", 0.99)])
+    results = ocr_engine.ocr_process_batch(["a.pdf"], dpi=100, escalate_dpi=200, min_confidence=0.85)
+    assert results[0]["识别方式"].endswith(ocr_engine.ESCALATED_SUFFIX)
+    assert len(calls) == 4 # 两种分辨率下各做一轮 ROI 与一轮整页识别
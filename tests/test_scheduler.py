@@ -0,0 +1,101 @@
+# tests/test_scheduler.py
+"""
+模块功能：
+    src.scheduler 的集成测试：用替身代替两个阶段的执行单元 (真实的进程池，不解析真实的 pdf)，
+    检查卡死与崩溃的文件能被隔离并给出最终状态，其余文件正常出结果，结果顺序与清单一致
+"""
+import os
+import time
+
+import pytest
+
+import src.scheduler as scheduler_module
+from src.pdf_handler import NEEDS_OCR, TIMEOUT_STATUS
+from src.scheduler import TwoStageScheduler, _largest_first
+
+
+def fake_enrich_batch(file_infos, allow_ocr=True, profile=False):
+    # 文件名决定行为：hang 卡死、crash 直接结束进程、scan 转交 OCR，其余正常解析
+    results = []
+    for info in file_infos:
+        name = os.path.basename(info["文件路径"])
+        if name.startswith("hang"):
+            time.sleep(60)
+        if name.startswith("crash"):
+            os._exit(1)
+        status = NEEDS_OCR if name.startswith("scan") else "按时通关"
+        results.append({**info, "状态": status, "耗时": "5分", "识别方式": "Text"})
+    return results
+
+
+def fake_ocr_enrich_batch(file_infos, ocr_options=None, profile=False):
+    method = "OCR-ROI" if (ocr_options or {}).get("roi_only") else "OCR-AI"
+    return [{**info, "状态": "按时通关", "耗时": "7分", "识别方式": method} for info in file_infos]
+
+
+class FakeCache:
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, digest):
+        return self.entries.get(digest)
+
+    def put(self, digest, fields):
+        self.entries[digest] = fields
+
+
+@pytest.fixture(autouse=True)
+def fake_workers(monkeypatch):
+    monkeypatch.setattr(scheduler_module, "enrich_batch", fake_enrich_batch)
+    monkeypatch.setattr(scheduler_module, "ocr_enrich_batch", fake_ocr_enrich_batch)
+
+
+def _manifest(names):
+    # 文件大小依次递增，largest_first 会打乱派发顺序，用于检查结果是否按清单顺序返回
+    return [{"文件路径": f"/data/{name}.pdf", "姓名": name, "文件大小": 1024 * (i + 1), "内容校验": f"crc-{name}"}
+            for i, name in enumerate(names)]
+
+
+def _scheduler(**kwargs):
+    options = dict(text_workers=2, ocr_workers=1, preload_ocr=False, ocr_flush_timeout=0.1,
+                   task_timeout=1.0, ocr_task_timeout=1.0, watch_interval=0.05)
+    options.update(kwargs)
+    return TwoStageScheduler(**options)
+
+
+def test_hung_and_crashed_files_are_isolated():
+    names = ["a", "hang", "b", "crash", "scan", "c"]
+    with _scheduler() as scheduler:
+        results = scheduler.run(_manifest(names))
+
+    assert [res["姓名"] for res in results] == names
+    status = {res["姓名"]: res["状态"] for res in results}
+    assert status["hang"] == TIMEOUT_STATUS
+    assert status["crash"] == "系统错误"
+    assert all(status[name] == "按时通关" for name in ("a", "b", "c", "scan"))
+    assert results[names.index("scan")]["识别方式"] == "OCR-AI"
+    assert scheduler.timeout_count == 1
+    assert scheduler.restart_count >= 1
+
+
+def test_degraded_retry_result_is_not_cached():
+    cache = FakeCache()
+    with _scheduler(retry_options={"roi_only": True}) as scheduler:
+        results = scheduler.run(_manifest(["a", "hang"]), cache=cache)
+
+    hung = results[1]
+    assert hung["状态"] == "按时通关" and hung["识别方式"] == "OCR-ROI"
+    assert set(cache.entries) == {"crc-a"}
+
+
+def test_stream_lookahead_orders_within_window():
+    infos = [{"文件路径": str(size), "文件大小": size} for size in (1, 5, 2, 9, 3, 4, 8)]
+    ordered = [info["文件大小"] for info in _largest_first(iter(infos), 3)]
+    assert ordered == [5, 9, 3, 4, 8, 2, 1]
+
+
+def test_streamed_manifest_keeps_arrival_order():
+    names = ["a", "b", "scan", "c", "d"]
+    with _scheduler(stream_lookahead=2) as scheduler:
+        results = scheduler.run(iter(_manifest(names)))
+    assert [res["姓名"] for res in results] == names
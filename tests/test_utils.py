@@ -0,0 +1,56 @@
+# tests/test_utils.py
+"""
+模块功能：
+    src.utils 的单元测试：整列版本的 parse_durations 必须与逐个调用 parse_time_to_minutes 的结果完全一致
+"""
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils import parse_durations, parse_time_to_minutes
+
+UNITS = ["天", "小时", "时", "分", "秒"]
+
+
+def _combinations():
+    # 各单位的全部非空组合 (按 天→时→分→秒 的顺序)，带或不带空格
+    values = []
+    for r in range(1, len(UNITS) + 1):
+        for units in itertools.combinations(UNITS, r):
+            text = "".join(f"{i + 1}{unit}" for i, unit in enumerate(units))
+            values += [text, " ".join(f"{i + 12} {unit}" for i, unit in enumerate(units))]
+    return values
+
+
+SPECIAL = ["--", "0", "", " 0 ", "无法判定", "OCR失败", "3天", "59秒", "1天2小时3分", "0时0分0秒"]
+
+
+@pytest.mark.parametrize("value", _combinations() + SPECIAL)
+def test_single_value_matches_scalar(value):
+    result = parse_durations(pd.Series([value]))
+    assert result.iloc[0] == parse_time_to_minutes(value)
+
+
+def test_column_matches_scalar_with_repeats_and_missing():
+    rng = np.random.default_rng(0)
+    pool = _combinations() + SPECIAL + [None, np.nan]
+    values = [pool[i] for i in rng.integers(0, len(pool), 2000)]
+    series = pd.Series(values, index=rng.permutation(2000) + 100)
+
+    result = parse_durations(series)
+
+    expected = pd.Series([parse_time_to_minutes(v) for v in values],
+                         index=series.index)
+    pd.testing.assert_series_equal(result, expected)
+
+
+def test_known_values():
+    series = pd.Series(["1天2小时3分", "1时30分", "90秒", "--", "0"])
+    assert parse_durations(series).tolist() == [1563.0, 90.0, 1.5, 0.0, 0.0]
+
+
+def test_empty_series():
+    result = parse_durations(pd.Series([], dtype=object))
+    assert result.empty